@@ -3,6 +3,8 @@ from langchain_openai import ChatOpenAI
 from typing import List, Dict
 import os
 from loguru import logger
+from config.llm_config import LLMConfig
+from utils.context_packer import ContextPacker
 
 
 class MissionPlanner:
@@ -14,6 +16,8 @@ class MissionPlanner:
             temperature=0.7,
             max_tokens=4096
         )
+        self.context_packer = ContextPacker()
+        self.context_budget = LLMConfig.get_context_budget(self.llm.model_name)
         
         self.agent = Agent(
             role="Test Mission Strategist",
@@ -30,8 +34,13 @@ class MissionPlanner:
         self,
         user_objective: str,
         persona_config: Dict,
-        crawl_context: str
+        crawl_context: str,
+        site_index: str = ""
     ) -> Task:
+        page_context = self.context_packer.pack_markdown(
+            crawl_context, user_objective, self.context_budget
+        )
+        
         task_description = f"""
         Create a detailed test mission plan for this objective:
         
@@ -44,7 +53,10 @@ class MissionPlanner:
         - Navigation Preference: {persona_config.get('preferred_navigation')}
         
         **Page Context**:
-        {crawl_context[:2000]}
+        {page_context}
+        
+        **Known Site Pages** (from pre-crawled site map):
+        {site_index or 'No site map available'}
         
         Break down the objective into a sequence of atomic steps that:
         1. Align with the persona's capabilities and limitations
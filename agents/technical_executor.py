@@ -3,6 +3,8 @@ from langchain_openai import ChatOpenAI
 from typing import Dict, List, Optional
 import os
 from loguru import logger
+from config.llm_config import LLMConfig
+from utils.context_packer import ContextPacker
 
 
 class TechnicalExecutor:
@@ -15,6 +17,8 @@ class TechnicalExecutor:
             temperature=0.3,
             max_tokens=8192
         )
+        self.context_packer = ContextPacker()
+        self.context_budget = LLMConfig.get_context_budget(self.llm.model_name)
         
         self.agent = Agent(
             role="Playwright Automation Engineer",
@@ -51,13 +55,17 @@ class TechnicalExecutor:
                 failure_context += f"- Selector: {failure.get('selector', 'N/A')}\n"
                 failure_context += f"  Error: {failure.get('error_message', 'N/A')}\n"
         
+        elements_context = self.context_packer.pack_schema(
+            semantic_schema.get('interactive_elements', []), mission, self.context_budget
+        )
+        
         task_description = f"""
         Generate a robust Playwright script to accomplish this mission:
         
         **Mission**: {mission}
         
         **Available UI Elements** (from semantic schema):
-        {str(semantic_schema.get('interactive_elements', []))[:2000]}
+        {elements_context}
         
         **UX Audit Insights**:
         {str(audit_results.get('summary', ''))[:1000]}
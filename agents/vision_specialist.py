@@ -5,6 +5,8 @@ import os
 from loguru import logger
 from config.state_schema import PersonaConfig, FrictionPoint
 from datetime import datetime
+from config.llm_config import LLMConfig
+from utils.context_packer import ContextPacker
 
 
 class VisionSpecialist:
@@ -16,6 +18,8 @@ class VisionSpecialist:
             temperature=0.5,
             max_tokens=4096
         )
+        self.context_packer = ContextPacker()
+        self.context_budget = LLMConfig.get_context_budget(self.llm.model)
         
         self.agent = Agent(
             role="UX Cognitive Auditor",
@@ -35,7 +39,8 @@ class VisionSpecialist:
         persona_config: PersonaConfig,
         semantic_schema: Dict,
         crawl_context: str,
-        screenshot_path: str = None
+        screenshot_path: str = None,
+        mission: str = ""
     ) -> Task:
         persona_description = f"""
         Persona Profile:
@@ -50,16 +55,25 @@ class VisionSpecialist:
         {chr(10).join(f'- {rule}' for rule in persona_config.attention_rules)}
         """
         
+        # Rank page sections against the mission and what this persona pays attention to
+        relevance_query = " ".join([mission] + list(persona_config.attention_rules))
+        page_context = self.context_packer.pack_markdown(
+            crawl_context, relevance_query, int(self.context_budget * 0.6)
+        )
+        schema_context = self.context_packer.pack_schema(
+            semantic_schema, relevance_query, int(self.context_budget * 0.4)
+        )
+        
         task_description = f"""
         Conduct a comprehensive cognitive UX audit of the interface with this persona:
         
         {persona_description}
         
         Page Context (Fit Markdown):
-        {crawl_context[:3000]}
+        {page_context}
         
         Semantic Schema:
-        {str(semantic_schema)[:2000]}
+        {schema_context}
         
         Your audit must identify:
         
@@ -154,5 +168,6 @@ class VisionSpecialist:
                 "overall_sentiment": "neutral",
                 "sentiment_score": 0.5,
                 "blocking_issues": [],
-                "summary": f"Audit parsing failed: {str(e)}"
+                "summary": f"Audit parsing failed: {str(e)}",
+                "parse_error": str(e)
             }
@@ -0,0 +1,137 @@
+"""
+Benchmark: single-pass FastHTMLExtractor vs. the previous three-pass BeautifulSoup fallback
+
+Usage:
+    python -m benchmarks.html_extractor_bench page1.html https://example.com/ ...
+    python -m benchmarks.html_extractor_bench            # synthetic large page
+
+Save real-world pages (e.g. from CrawlScout's `html` output or "Save page as")
+to compare on representative markup.
+"""
+
+import sys
+import time
+import tracemalloc
+import urllib.request
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from integrations.html_extractor import extract_page_structure
+
+
+def legacy_fallback_extraction(html_content: Optional[str]) -> Dict:
+    """The previous ScrapeMapper fallback, kept here as the baseline"""
+    from bs4 import BeautifulSoup
+    
+    if not html_content:
+        return {"success": False, "error": "No HTML content provided"}
+    
+    soup = BeautifulSoup(html_content, 'lxml')
+    
+    interactive_elements = []
+    for tag in soup.find_all(['button', 'a', 'input', 'select', 'textarea']):
+        interactive_elements.append({
+            "tag": tag.name,
+            "text": tag.get_text(strip=True)[:100],
+            "id": tag.get('id'),
+            "class": tag.get('class'),
+            "type": tag.get('type'),
+            "href": tag.get('href'),
+            "aria_label": tag.get('aria-label'),
+            "role": tag.get('role')
+        })
+    
+    navigation = []
+    for nav in soup.find_all('nav'):
+        navigation.append({
+            "id": nav.get('id'),
+            "class": nav.get('class'),
+            "links": [a.get_text(strip=True) for a in nav.find_all('a')]
+        })
+    
+    return {
+        "success": True,
+        "fallback": True,
+        "interactive_elements": interactive_elements[:50],
+        "navigation": navigation,
+        "headings": [h.get_text(strip=True) for h in soup.find_all(['h1', 'h2', 'h3'])]
+    }
+
+
+def synthetic_page(sections: int = 2000) -> str:
+    """Large e-commerce-like page: navigation, product grid, forms, footer"""
+    nav = "".join(f'<li><a href="/c/{i}">Category {i}</a></li>' for i in range(60))
+    body = []
+    for i in range(sections):
+        body.append(
+            f'<section class="product card"><h2>Product {i}</h2>'
+            f'<div class="media"><img src="/img/{i}.jpg"><span class="badge">New</span></div>'
+            f'<p>Description for product {i} with <b>bold</b> and <i>italic</i> text.</p>'
+            f'<form action="/cart" method="post"><input type="hidden" name="sku" value="{i}">'
+            f'<select name="qty-{i}"><option>1</option><option>2</option></select>'
+            f'<button class="btn add" data-testid="add-{i}">Add to cart</button></form>'
+            f'<a href="/p/{i}" aria-label="Details for product {i}">Details</a></section>'
+        )
+    return (
+        f'<html><head><title>Bench</title><script>var x = "<a>";</script></head><body>'
+        f'<header><nav id="main-nav"><ul>{nav}</ul></nav></header>'
+        f'<main id="content">{"".join(body)}</main>'
+        f'<footer><nav aria-label="Footer">{nav}</nav></footer></body></html>'
+    )
+
+
+def load_pages(args: List[str]) -> List[Tuple[str, str]]:
+    if not args:
+        return [("synthetic (2000 product cards)", synthetic_page())]
+    
+    pages = []
+    for arg in args:
+        if arg.startswith(("http://", "https://")):
+            request = urllib.request.Request(arg, headers={"User-Agent": "HitlAI-Benchmark"})
+            with urllib.request.urlopen(request, timeout=30) as response:
+                pages.append((arg, response.read().decode("utf-8", errors="replace")))
+        else:
+            pages.append((arg, Path(arg).read_text(encoding="utf-8", errors="replace")))
+    return pages
+
+
+def measure(fn: Callable[[str], Dict], html: str, repeats: int = 5) -> Dict:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(html)
+        timings.append(time.perf_counter() - start)
+    
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return {
+        "best_ms": min(timings) * 1000,
+        "median_ms": sorted(timings)[len(timings) // 2] * 1000,
+        "peak_mb": peak / 1024 / 1024,
+        "elements": len(result.get("interactive_elements", []))
+    }
+
+
+def main(args: List[str]):
+    extractors = [("single-pass", extract_page_structure)]
+    try:
+        import bs4  # noqa: F401
+        extractors.insert(0, ("bs4 three-pass", legacy_fallback_extraction))
+    except ImportError:
+        print("beautifulsoup4 is not installed (pip install -r requirements.txt); skipping the bs4 baseline")
+    
+    for name, html in load_pages(args):
+        print(f"\n{name} ({len(html) / 1024:.0f} KiB)")
+        for label, fn in extractors:
+            stats = measure(fn, html)
+            print(
+                f"  {label:<15} best {stats['best_ms']:8.1f} ms | median {stats['median_ms']:8.1f} ms | "
+                f"peak {stats['peak_mb']:6.1f} MiB | {stats['elements']} interactive elements"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
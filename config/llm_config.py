@@ -7,6 +7,14 @@ load_dotenv()
 
 class LLMConfig:
     
+    # Tokens of page/schema context packed into each agent prompt, per model
+    CONTEXT_TOKEN_BUDGETS = {
+        "gpt-4-turbo-preview": 600,
+        "claude-3-5-sonnet-20240620": 1200,
+        "deepseek-chat": 500,
+        "grok-beta": 500
+    }
+    
     @staticmethod
     def get_openai_config() -> Dict[str, Any]:
         return {
@@ -45,6 +53,10 @@ class LLMConfig:
             "max_tokens": 4096
         }
     
+    @staticmethod
+    def get_context_budget(model: str, default: int = 500) -> int:
+        return LLMConfig.CONTEXT_TOKEN_BUDGETS.get(model, default)
+    
     @staticmethod
     def get_mission_planner_config() -> Dict[str, Any]:
         return LLMConfig.get_openai_config()
@@ -49,6 +49,9 @@ class AgentState(TypedDict):
     persona_config: PersonaConfig
     
     crawl_context: Optional[str]
+    page_html: Optional[str]
+    page_fingerprint: Optional[str]
+    page_structure_hash: Optional[str]
     semantic_schema: Optional[Dict]
     
     current_mission: str
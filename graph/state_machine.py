@@ -7,8 +7,11 @@ import json
 from loguru import logger
 from config.state_schema import AgentState, PersonaConfig
 from memory.vector_store import VectorMemoryStore
+from memory.page_cache import PageAuditCache
+from memory.write_behind import LessonWriteQueue
 from integrations.crawl_scout import CrawlScout
 from integrations.scrape_mapper import ScrapeMapper
+from integrations.site_crawler import SiteCrawler
 from agents.vision_specialist import VisionSpecialist
 from agents.technical_executor import TechnicalExecutor
 from agents.mission_planner import MissionPlanner
@@ -20,13 +23,17 @@ class HitlAIStateMachine:
     
     def __init__(self):
         self.memory_store = VectorMemoryStore()
+        self.page_cache = PageAuditCache()
+        self.lesson_queue = LessonWriteQueue(self.memory_store)
         self.crawl_scout = CrawlScout()
         self.scrape_mapper = ScrapeMapper()
+        self.site_crawler = SiteCrawler()
         self.vision_specialist = VisionSpecialist()
         self.technical_executor = TechnicalExecutor()
         self.mission_planner = MissionPlanner()
         
         self.hitl_threshold = int(os.getenv("HITL_INTERRUPT_THRESHOLD", "3"))
+        self.incremental_audit = os.getenv("INCREMENTAL_AUDIT", "true").lower() == "true"
         
         self.graph = self._build_graph()
     
@@ -93,10 +100,16 @@ class HitlAIStateMachine:
     def plan_mission_node(self, state: AgentState) -> AgentState:
         logger.info("Planning mission...")
         
+        site_map = self.site_crawler.load_site_map(state['url'])
+        site_index = SiteCrawler.summarize_site_map(site_map) if site_map else ""
+        if site_map:
+            logger.info(f"Planning against site map with {len(site_map['pages'])} pages")
+        
         task = self.mission_planner.create_planning_task(
             user_objective=state['current_mission'],
             persona_config=state['persona_config'].dict(),
-            crawl_context=state.get('crawl_context', '')
+            crawl_context=state.get('crawl_context') or '',
+            site_index=site_index
         )
         
         crew = Crew(
@@ -137,6 +150,9 @@ class HitlAIStateMachine:
             logger.warning(f"Cross-platform friction detected: {cross_platform_check['metadata']['friction_type']}")
             lessons.insert(0, cross_platform_check)
         
+        # Lessons learned earlier but not yet flushed to the vector store
+        lessons = self.lesson_queue.pending_lessons(url=state['url'], platform=state['platform']) + lessons
+        
         state['memory_retrieved'] = lessons
         state['messages'].append({
             "role": "memory",
@@ -152,6 +168,13 @@ class HitlAIStateMachine:
         
         if scan_result['success']:
             state['crawl_context'] = scan_result['fit_markdown']
+            state['page_html'] = scan_result['html']
+            state['page_fingerprint'] = scan_result['fingerprint']
+            state['page_structure_hash'] = scan_result['structure_hash']
+            
+            if self.page_cache.get_previous_fingerprint(state['url']) == scan_result['fingerprint']:
+                logger.info("Page fingerprint unchanged since last run")
+            
             state['messages'].append({
                 "role": "scout",
                 "content": f"Page scanned successfully. Markdown length: {len(scan_result['fit_markdown'])}"
@@ -168,10 +191,18 @@ class HitlAIStateMachine:
     def map_schema_node(self, state: AgentState) -> AgentState:
         logger.info("Mapping semantic schema...")
         
-        schema = self.scrape_mapper.map_semantic_schema(
-            url=state['url'],
-            html_content=state.get('crawl_context')
-        )
+        fingerprint = state.get('page_fingerprint') if self.incremental_audit else None
+        schema = self.page_cache.get_schema(state['url'], fingerprint)
+        
+        if schema:
+            logger.info("Page unchanged since last run, reusing cached semantic schema")
+        else:
+            schema = self.scrape_mapper.map_semantic_schema(
+                url=state['url'],
+                html_content=state.get('page_html'),
+                structure_hash=state.get('page_structure_hash')
+            )
+            self.page_cache.store_schema(state['url'], fingerprint, schema)
         
         state['semantic_schema'] = schema
         state['messages'].append({
@@ -184,20 +215,41 @@ class HitlAIStateMachine:
     def audit_ux_node(self, state: AgentState) -> AgentState:
         logger.info("Auditing UX with Vision Specialist...")
         
-        task = self.vision_specialist.create_audit_task(
-            persona_config=state['persona_config'],
-            semantic_schema=state['semantic_schema'],
-            crawl_context=state['crawl_context']
-        )
-        
-        crew = Crew(
-            agents=[self.vision_specialist.agent],
-            tasks=[task],
-            verbose=True
+        fingerprint = state.get('page_fingerprint') if self.incremental_audit else None
+        prompt_inputs = {
+            'mission': state['current_mission'],
+            'persona_config': state['persona_config'].dict(),
+            'semantic_schema': state['semantic_schema'],
+            'context_budget': self.vision_specialist.context_budget,
+            'model': self.vision_specialist.llm.model
+        }
+        audit_results = self.page_cache.get_audit(
+            state['url'], fingerprint, state['persona'], state['platform'], prompt_inputs
         )
         
-        result = crew.kickoff()
-        audit_results = self.vision_specialist.parse_audit_results(str(result))
+        if audit_results:
+            logger.info("Page unchanged since last run, reusing cached audit results")
+        else:
+            task = self.vision_specialist.create_audit_task(
+                persona_config=state['persona_config'],
+                semantic_schema=state['semantic_schema'],
+                crawl_context=state['crawl_context'],
+                mission=state['current_mission']
+            )
+            
+            crew = Crew(
+                agents=[self.vision_specialist.agent],
+                tasks=[task],
+                verbose=True
+            )
+            
+            result = crew.kickoff()
+            audit_results = self.vision_specialist.parse_audit_results(str(result))
+            
+            if 'parse_error' not in audit_results:
+                self.page_cache.store_audit(
+                    state['url'], fingerprint, state['persona'], state['platform'], audit_results, prompt_inputs
+                )
         
         state['audit_results'] = audit_results
         state['friction_points'].extend(audit_results['friction_points'])
@@ -327,13 +379,15 @@ class HitlAIStateMachine:
             lesson_text += f"Failure: {state['action_attempts'][-1].error_message}\n"
             lesson_text += f"Human Resolution: {state['hitl_feedback']}"
             
-            self.memory_store.store_lesson(
+            # Embedding and upsert happen in the background; the run continues immediately
+            pending_lesson = self.lesson_queue.enqueue(
                 lesson_text=lesson_text,
                 url=state['url'],
                 platform=state['platform'],
                 friction_type="hitl_intervention",
                 resolution=state['hitl_feedback']
             )
+            state['memory_retrieved'] = [pending_lesson] + state['memory_retrieved']
             
             state['failure_count'] = 0
             state['hitl_interrupt'] = False
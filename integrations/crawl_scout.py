@@ -2,6 +2,14 @@ import asyncio
 from typing import Dict, Optional
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
 from loguru import logger
+from integrations.page_fingerprint import fingerprint_page
+from utils.helpers import normalize_url
+from utils.single_flight import SingleFlight
+
+
+# Shared by every CrawlScout in the process so that concurrent test runs
+# targeting the same page (e.g. multi-persona sweeps) render it only once.
+_scan_flight = SingleFlight("crawl_scout")
 
 
 class CrawlScout:
@@ -13,46 +21,64 @@ class CrawlScout:
         )
     
     async def scan_site(self, url: str, wait_for: Optional[str] = None) -> Dict:
+        key = f"{normalize_url(url)}|wait_for={wait_for or 'body'}"
+        return await _scan_flight.do(key, lambda: self._scan_site(url, wait_for))
+    
+    async def _scan_site(self, url: str, wait_for: Optional[str] = None) -> Dict:
+        async with AsyncWebCrawler(config=self.browser_config) as crawler:
+            return await self.scan_with_crawler(crawler, url, wait_for)
+    
+    async def scan_with_crawler(
+        self,
+        crawler: AsyncWebCrawler,
+        url: str,
+        wait_for: Optional[str] = None,
+        screenshot: bool = True
+    ) -> Dict:
         logger.info(f"Starting Crawl4AI scan for: {url}")
         
         crawler_config = CrawlerRunConfig(
             cache_mode=CacheMode.BYPASS,
             wait_for=wait_for if wait_for else "body",
             page_timeout=30000,
-            screenshot=True,
+            screenshot=screenshot,
             pdf=False
         )
         
-        async with AsyncWebCrawler(config=self.browser_config) as crawler:
-            result = await crawler.arun(
-                url=url,
-                config=crawler_config
-            )
-            
-            if not result.success:
-                logger.error(f"Crawl failed: {result.error_message}")
-                return {
-                    "success": False,
-                    "error": result.error_message
-                }
-            
-            fit_markdown = result.markdown_v2.fit_markdown if hasattr(result.markdown_v2, 'fit_markdown') else result.markdown
-            
-            scan_data = {
-                "success": True,
-                "url": url,
-                "title": result.metadata.get("title", ""),
-                "fit_markdown": fit_markdown,
-                "raw_markdown": result.markdown,
-                "html": result.html,
-                "links": result.links.get("internal", []) if hasattr(result, 'links') else [],
-                "media": result.media if hasattr(result, 'media') else {},
-                "screenshot": result.screenshot,
-                "metadata": result.metadata
+        result = await crawler.arun(
+            url=url,
+            config=crawler_config
+        )
+        
+        if not result.success:
+            logger.error(f"Crawl failed: {result.error_message}")
+            return {
+                "success": False,
+                "error": result.error_message
             }
-            
-            logger.info(f"Crawl completed successfully. Markdown length: {len(fit_markdown)}")
-            return scan_data
+        
+        fit_markdown = result.markdown_v2.fit_markdown if hasattr(result.markdown_v2, 'fit_markdown') else result.markdown
+        
+        scan_data = {
+            "success": True,
+            "url": url,
+            "title": result.metadata.get("title", ""),
+            "fit_markdown": fit_markdown,
+            "raw_markdown": result.markdown,
+            "html": result.html,
+            "links": result.links.get("internal", []) if hasattr(result, 'links') else [],
+            "media": result.media if hasattr(result, 'media') else {},
+            "screenshot": result.screenshot,
+            "metadata": result.metadata,
+            **fingerprint_page(result.html)
+        }
+        
+        logger.info(f"Crawl completed successfully. Markdown length: {len(fit_markdown)}")
+        return scan_data
     
     def scan_site_sync(self, url: str, wait_for: Optional[str] = None) -> Dict:
         return asyncio.run(self.scan_site(url, wait_for))
+    
+    @staticmethod
+    def get_metrics() -> Dict:
+        return _scan_flight.get_metrics()
@@ -0,0 +1,261 @@
+import re
+from io import BytesIO
+from collections import Counter
+from typing import Dict, List, Optional
+from lxml import etree
+
+
+INTERACTIVE_TAGS = {"a", "button", "input", "select", "textarea"}
+INTERACTIVE_ROLES = {
+    "button", "link", "checkbox", "radio", "switch", "tab", "menuitem",
+    "option", "combobox", "textbox", "searchbox", "slider"
+}
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+FORM_FIELD_TAGS = {"input", "select", "textarea", "button"}
+LANDMARK_TAGS = {"header", "nav", "main", "footer", "aside", "form", "search"}
+LANDMARK_ROLES = {"banner", "navigation", "main", "contentinfo", "complementary", "search", "form"}
+SKIPPED_TAGS = {"script", "style", "noscript", "template"}
+
+CSS_IDENTIFIER = re.compile(r"^-?[A-Za-z_][\w-]*$")
+WHITESPACE = re.compile(r"\s+")
+
+
+def _attribute_selector(tag: str, name: str, value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'{tag}[{name}="{escaped}"]'
+
+
+class _Node:
+    
+    __slots__ = ("tag", "attrs", "path", "anchors", "record", "implicit_body")
+    
+    def __init__(self, tag: str, attrs: Dict, path: tuple, anchors: tuple):
+        self.tag = tag
+        self.attrs = attrs
+        self.path = path
+        self.anchors = anchors
+        self.record = None
+        # Tables only: (path, child counts) of the <tbody> a browser wraps bare rows in
+        self.implicit_body = None
+
+
+# Single streaming pass over the document (lxml iterparse) that collects
+# interactive elements, navigation, headings, forms and ARIA usage, and
+# assigns each collected element a unique CSS selector.
+class FastHTMLExtractor:
+    
+    def __init__(self, max_text_length: int = 100):
+        self.max_text_length = max_text_length
+    
+    def extract(self, html: str) -> Dict:
+        interactive_elements = []
+        navigation = []
+        headings = []
+        forms = []
+        roles = Counter()
+        landmarks = Counter()
+        aria_labelled = 0
+        images_missing_alt = 0
+        
+        # Uniqueness of selector candidates is only known once the whole page is read
+        id_counts = Counter()
+        attribute_counts = Counter()
+        
+        stack: List[_Node] = []
+        child_counts: List[Counter] = [Counter()]
+        open_navs: List[Dict] = []
+        open_forms: List[Dict] = []
+        capture_depth = 0
+        skip_depth = 0
+        
+        events = etree.iterparse(
+            BytesIO(html.encode("utf-8", errors="replace")),
+            events=("start", "end"),
+            html=True,
+            recover=True,
+            encoding="utf-8"
+        )
+        
+        for event, element in events:
+            if not isinstance(element.tag, str):
+                continue
+            tag = element.tag.lower()
+            
+            if tag in SKIPPED_TAGS or skip_depth:
+                if tag in SKIPPED_TAGS:
+                    skip_depth += 1 if event == "start" else -1
+                if event == "end":
+                    element.clear(keep_tail=True)
+                continue
+            
+            if event == "end":
+                node = stack.pop()
+                child_counts.pop()
+                
+                if node.record is not None:
+                    capture_depth -= 1
+                    text = WHITESPACE.sub(" ", "".join(element.itertext())).strip()
+                    node.record["text"] = text[:self.max_text_length]
+                    if node.tag == "a" and open_navs:
+                        open_navs[-1]["links"].append(node.record)
+                
+                if open_navs and open_navs[-1]["_node"] is node:
+                    open_navs.pop()
+                if open_forms and open_forms[-1]["_node"] is node:
+                    open_forms.pop()
+                
+                # Release parsed subtrees so memory stays flat on large pages
+                if not capture_depth:
+                    element.clear(keep_tail=True)
+                    while element.getprevious() is not None:
+                        del element.getparent()[0]
+                continue
+            
+            attrs = dict(element.attrib)
+            parent = stack[-1] if stack else None
+            parent_path = parent.path if parent else ()
+            siblings = child_counts[-1]
+            
+            # lxml keeps <tr> directly under <table>, but browsers (and Playwright) insert
+            # a <tbody> around each run of such rows; mirror it so selectors match the live DOM
+            if parent is not None and parent.tag == "table":
+                if tag == "tr":
+                    if parent.implicit_body is None:
+                        siblings["tbody"] += 1
+                        parent.implicit_body = (
+                            parent.path + (f"tbody:nth-of-type({siblings['tbody']})",), Counter()
+                        )
+                    parent_path, siblings = parent.implicit_body
+                else:
+                    parent.implicit_body = None
+            
+            siblings[tag] += 1
+            segment = f"{tag}:nth-of-type({siblings[tag]})"
+            child_counts.append(Counter())
+            
+            path = parent_path + (segment,)
+            anchors = parent.anchors if parent else ()
+            
+            element_id = attrs.get("id")
+            if element_id:
+                id_counts[element_id] += 1
+                anchors = anchors + ((len(path) - 1, element_id),)
+            for name in ("data-testid", "name", "aria-label"):
+                if attrs.get(name):
+                    attribute_counts[(tag, name, attrs[name])] += 1
+            
+            node = _Node(tag, attrs, path, anchors)
+            stack.append(node)
+            
+            role = attrs.get("role")
+            if role:
+                roles[role] += 1
+            if tag in LANDMARK_TAGS or role in LANDMARK_ROLES:
+                landmarks[role or tag] += 1
+            if attrs.get("aria-label") or attrs.get("aria-labelledby"):
+                aria_labelled += 1
+            if tag == "img" and "alt" not in attrs:
+                images_missing_alt += 1
+            
+            if tag == "nav" or role == "navigation":
+                nav = {
+                    "id": element_id,
+                    "class": attrs.get("class", "").split() or None,
+                    "aria_label": attrs.get("aria-label"),
+                    "links": [],
+                    "_node": node
+                }
+                navigation.append(nav)
+                open_navs.append(nav)
+            
+            if tag == "form":
+                form = {
+                    "id": element_id,
+                    "name": attrs.get("name"),
+                    "action": attrs.get("action"),
+                    "method": (attrs.get("method") or "get").lower(),
+                    "fields": [],
+                    "_node": node
+                }
+                forms.append(form)
+                open_forms.append(form)
+            
+            is_interactive = (
+                (tag in INTERACTIVE_TAGS and not (tag == "input" and attrs.get("type") == "hidden"))
+                or role in INTERACTIVE_ROLES
+            )
+            if is_interactive:
+                node.record = {
+                    "tag": tag,
+                    "id": element_id,
+                    "class": attrs.get("class", "").split() or None,
+                    "type": attrs.get("type"),
+                    "href": attrs.get("href"),
+                    "name": attrs.get("name"),
+                    "placeholder": attrs.get("placeholder"),
+                    "aria_label": attrs.get("aria-label"),
+                    "role": role,
+                    "disabled": "disabled" in attrs or attrs.get("aria-disabled") == "true",
+                    "_node": node
+                }
+                interactive_elements.append(node.record)
+                if open_forms and tag in FORM_FIELD_TAGS:
+                    open_forms[-1]["fields"].append(node.record)
+            elif tag in HEADING_TAGS:
+                node.record = {"tag": tag, "level": int(tag[1]), "_node": node}
+                headings.append(node.record)
+            
+            if node.record is not None:
+                capture_depth += 1
+        
+        for record in interactive_elements + headings:
+            record["selector"] = self._selector_for(record.pop("_node"), id_counts, attribute_counts)
+        for nav in navigation:
+            nav.pop("_node")
+            nav["links"] = [
+                {"text": link["text"], "href": link["href"], "selector": link["selector"]}
+                for link in nav["links"]
+            ]
+        for form in forms:
+            form.pop("_node")
+            form["fields"] = [field["selector"] for field in form["fields"]]
+        
+        return {
+            "success": True,
+            "fallback": True,
+            "interactive_elements": interactive_elements,
+            "navigation": navigation,
+            "headings": headings,
+            "forms": forms,
+            "accessibility": {
+                "landmarks": dict(landmarks),
+                "roles": dict(roles),
+                "aria_labelled_elements": aria_labelled,
+                "images_missing_alt": images_missing_alt
+            }
+        }
+    
+    @staticmethod
+    def _selector_for(node: _Node, id_counts: Counter, attribute_counts: Counter) -> str:
+        attrs = node.attrs
+        
+        element_id = attrs.get("id")
+        if element_id and id_counts[element_id] == 1 and CSS_IDENTIFIER.match(element_id):
+            return f"#{element_id}"
+        
+        for name in ("data-testid", "name", "aria-label"):
+            value = attrs.get(name)
+            if value and attribute_counts[(node.tag, name, value)] == 1:
+                return _attribute_selector(node.tag, name, value)
+        
+        # Structural path, anchored at the nearest ancestor with a unique id
+        for index, anchor_id in reversed(node.anchors):
+            if id_counts[anchor_id] == 1 and CSS_IDENTIFIER.match(anchor_id):
+                return " > ".join((f"#{anchor_id}",) + node.path[index + 1:])
+        return " > ".join(node.path)
+
+
+def extract_page_structure(html: Optional[str], max_text_length: int = 100) -> Dict:
+    if not html:
+        return {"success": False, "error": "No HTML content provided"}
+    return FastHTMLExtractor(max_text_length=max_text_length).extract(html)
@@ -0,0 +1,73 @@
+import hashlib
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+
+# Subtrees whose content is not rendered as visible page text
+IGNORED_TAGS = {"script", "style", "noscript", "template", "svg", "head"}
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr"
+}
+STRUCTURAL_VOID_TAGS = {"img", "input"}
+
+# Attributes that describe what an element is, as opposed to per-render values
+# (ids, classes, nonces, CSRF tokens) that change without the page changing
+STRUCTURAL_ATTRIBUTES = ("type", "role", "name", "aria-label")
+
+
+class _FingerprintParser(HTMLParser):
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.structure: List[str] = []
+        self.text: List[str] = []
+        self._ignored_depth = 0
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in IGNORED_TAGS:
+            self._ignored_depth += 1
+            return
+        if self._ignored_depth or (tag in VOID_TAGS and tag not in STRUCTURAL_VOID_TAGS):
+            return
+        
+        attrs = dict(attrs)
+        self.structure.append(tag + "".join(
+            f"[{name}={attrs[name]}]" for name in STRUCTURAL_ATTRIBUTES if attrs.get(name)
+        ))
+    
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in IGNORED_TAGS:
+            self._ignored_depth -= 1
+    
+    def handle_endtag(self, tag):
+        if tag in IGNORED_TAGS:
+            self._ignored_depth = max(0, self._ignored_depth - 1)
+            return
+        if not self._ignored_depth and tag not in VOID_TAGS:
+            self.structure.append(f"/{tag}")
+    
+    def handle_data(self, data):
+        if not self._ignored_depth:
+            text = data.strip()
+            if text:
+                self.text.append(text)
+
+
+def fingerprint_page(html: Optional[str]) -> Dict[str, str]:
+    parser = _FingerprintParser()
+    parser.feed(html or "")
+    parser.close()
+    
+    structure_hash = hashlib.sha256("\n".join(parser.structure).encode()).hexdigest()
+    visible_text = re.sub(r"\s+", " ", " ".join(parser.text)).strip()
+    text_hash = hashlib.sha256(visible_text.encode()).hexdigest()
+    
+    return {
+        "fingerprint": hashlib.sha256(f"{structure_hash}:{text_hash}".encode()).hexdigest(),
+        "structure_hash": structure_hash,
+        "text_hash": text_hash
+    }
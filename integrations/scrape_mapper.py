@@ -1,27 +1,58 @@
 import os
-from typing import Dict, Optional
-from scrapegraph_py import Client
+import copy
+import asyncio
+from typing import Dict, List, Optional
+from scrapegraph_py import Client, AsyncClient
 from loguru import logger
+from integrations.html_extractor import extract_page_structure
+from integrations.page_fingerprint import fingerprint_page
+from utils.helpers import normalize_url
+from utils.lru_cache import LRUCache
+from utils.rate_limiter import TokenBucket
 
 
 class ScrapeMapper:
     
-    def __init__(self):
+    _rate_limiter: Optional[TokenBucket] = None
+    
+    def __init__(self, send_rendered_html: Optional[bool] = None):
         self.api_key = os.getenv("SCRAPEGRAPH_API_KEY")
         self.client = Client(api_key=self.api_key) if self.api_key else None
+        
+        # Send the HTML CrawlScout already rendered instead of having ScrapeGraph re-crawl the URL
+        if send_rendered_html is None:
+            send_rendered_html = os.getenv("SCRAPEGRAPH_SEND_HTML", "false").lower() == "true"
+        self.send_rendered_html = send_rendered_html
+        
+        self.schema_cache = LRUCache(
+            max_size=int(os.getenv("SCHEMA_CACHE_SIZE", "256")),
+            ttl=float(os.getenv("SCHEMA_CACHE_TTL", "3600"))
+        )
+        
+        # The quota belongs to the API key, so every mapper in the process (sync
+        # and async calls alike) draws from one shared bucket
+        if ScrapeMapper._rate_limiter is None:
+            ScrapeMapper._rate_limiter = TokenBucket(
+                rate=float(os.getenv("SCRAPEGRAPH_RATE_LIMIT", "1.0")),
+                capacity=float(os.getenv("SCRAPEGRAPH_BURST", "5"))
+            )
+        self.rate_limiter = ScrapeMapper._rate_limiter
+        self.max_concurrency = int(os.getenv("SCRAPEGRAPH_MAX_CONCURRENCY", "4"))
+        self._async_client: Optional[AsyncClient] = None
+        self._async_client_loop = None
     
-    def map_semantic_schema(
+    def _cache_key(
         self,
         url: str,
-        html_content: Optional[str] = None,
-        focus_elements: Optional[list] = None
-    ) -> Dict:
-        if not self.client:
-            logger.warning("ScrapeGraphAI client not initialized, using fallback parser")
-            return self._fallback_schema_extraction(html_content)
-        
-        logger.info(f"Mapping semantic schema for: {url}")
-        
+        html_content: Optional[str],
+        focus_elements: Optional[list],
+        structure_hash: Optional[str]
+    ) -> tuple:
+        if structure_hash is None and html_content:
+            structure_hash = fingerprint_page(html_content)["structure_hash"]
+        return (normalize_url(url), structure_hash, tuple(sorted(focus_elements or [])))
+    
+    def _build_prompt(self, focus_elements: Optional[list]) -> str:
         prompt = """
         Extract the semantic UI schema of this page. Focus on:
         1. Interactive elements (buttons, links, forms, inputs)
@@ -38,69 +69,155 @@ class ScrapeMapper:
         - visual_cues: important visual design patterns
         """
         
+        if focus_elements:
+            prompt += f"\n\nPay special attention to these elements: {', '.join(focus_elements)}"
+        return prompt
+    
+    def _smartscraper_params(self, url: str, html_content: Optional[str], focus_elements: Optional[list]) -> Dict:
+        params = {"user_prompt": self._build_prompt(focus_elements)}
+        if self.send_rendered_html and html_content:
+            params["website_html"] = html_content
+        else:
+            params["website_url"] = url
+        return params
+    
+    def _build_schema(self, url: str, response: Dict) -> Dict:
+        return {
+            "success": True,
+            "url": url,
+            "schema": response,
+            "interactive_elements": self._extract_interactive_elements(response),
+            "navigation": self._extract_navigation(response),
+            "accessibility": self._extract_accessibility(response)
+        }
+    
+    def map_semantic_schema(
+        self,
+        url: str,
+        html_content: Optional[str] = None,
+        focus_elements: Optional[list] = None,
+        structure_hash: Optional[str] = None
+    ) -> Dict:
+        if not self.client:
+            logger.warning("ScrapeGraphAI client not initialized, using fallback parser")
+            return self._fallback_schema_extraction(html_content)
+        
+        cache_key = self._cache_key(url, html_content, focus_elements, structure_hash)
+        cached = self.schema_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Semantic schema cache hit for: {url}")
+            # Callers may mutate the schema; never hand out the cached object itself
+            return copy.deepcopy(cached)
+        
+        logger.info(f"Mapping semantic schema for: {url}")
+        
         try:
-            if focus_elements:
-                prompt += f"\n\nPay special attention to these elements: {', '.join(focus_elements)}"
-            
+            self.rate_limiter.acquire_sync()
             response = self.client.smartscraper(
-                website_url=url,
-                user_prompt=prompt
+                **self._smartscraper_params(url, html_content, focus_elements)
             )
             
-            schema = {
-                "success": True,
-                "url": url,
-                "schema": response,
-                "interactive_elements": self._extract_interactive_elements(response),
-                "navigation": self._extract_navigation(response),
-                "accessibility": self._extract_accessibility(response)
-            }
-            
+            schema = self._build_schema(url, response)
+            self.schema_cache.set(cache_key, copy.deepcopy(schema))
             logger.info("Semantic schema mapping completed")
             return schema
-            
+        
         except Exception as e:
             logger.error(f"ScrapeGraphAI error: {str(e)}")
             return self._fallback_schema_extraction(html_content)
     
-    def _fallback_schema_extraction(self, html_content: Optional[str]) -> Dict:
-        from bs4 import BeautifulSoup
+    async def _get_async_client(self) -> AsyncClient:
+        # The async client's connection pool is bound to the event loop it was created in
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            if self._async_client is not None:
+                await self._close_stale_client(self._async_client, self._async_client_loop)
+            self._async_client = AsyncClient(api_key=self.api_key)
+            self._async_client_loop = loop
+        return self._async_client
+    
+    @staticmethod
+    async def _close_stale_client(client: AsyncClient, loop):
+        # Close a client left behind by another event loop so its connections are released:
+        # on its own loop if that loop is still running, otherwise best effort from this one
+        try:
+            if loop is not None and loop.is_running() and not loop.is_closed():
+                asyncio.run_coroutine_threadsafe(client.close(), loop)
+            else:
+                await client.close()
+        except Exception as e:
+            logger.debug(f"Could not close stale ScrapeGraph client: {str(e)}")
+    
+    async def amap_semantic_schema(
+        self,
+        url: str,
+        html_content: Optional[str] = None,
+        focus_elements: Optional[list] = None,
+        structure_hash: Optional[str] = None
+    ) -> Dict:
+        if not self.api_key:
+            logger.warning("ScrapeGraphAI client not initialized, using fallback parser")
+            return await asyncio.to_thread(self._fallback_schema_extraction, html_content)
+        
+        cache_key = self._cache_key(url, html_content, focus_elements, structure_hash)
+        cached = self.schema_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Semantic schema cache hit for: {url}")
+            # Callers may mutate the schema; never hand out the cached object itself
+            return copy.deepcopy(cached)
         
-        if not html_content:
-            return {"success": False, "error": "No HTML content provided"}
+        logger.info(f"Mapping semantic schema for: {url}")
         
-        soup = BeautifulSoup(html_content, 'lxml')
+        try:
+            client = await self._get_async_client()
+            await self.rate_limiter.acquire()
+            response = await client.smartscraper(
+                **self._smartscraper_params(url, html_content, focus_elements)
+            )
+            
+            schema = self._build_schema(url, response)
+            self.schema_cache.set(cache_key, copy.deepcopy(schema))
+            logger.info(f"Semantic schema mapping completed for: {url}")
+            return schema
         
-        interactive_elements = []
-        for tag in soup.find_all(['button', 'a', 'input', 'select', 'textarea']):
-            element_data = {
-                "tag": tag.name,
-                "text": tag.get_text(strip=True)[:100],
-                "id": tag.get('id'),
-                "class": tag.get('class'),
-                "type": tag.get('type'),
-                "href": tag.get('href'),
-                "aria_label": tag.get('aria-label'),
-                "role": tag.get('role')
-            }
-            interactive_elements.append(element_data)
+        except Exception as e:
+            logger.error(f"ScrapeGraphAI error for {url}: {str(e)}")
+            return await asyncio.to_thread(self._fallback_schema_extraction, html_content)
+    
+    async def map_many(self, pages: List[Dict], max_concurrency: Optional[int] = None) -> List[Dict]:
+        # pages: [{"url": ..., "html_content": ..., "focus_elements": ..., "structure_hash": ...}]
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
         
-        navigation = []
-        for nav in soup.find_all('nav'):
-            nav_data = {
-                "id": nav.get('id'),
-                "class": nav.get('class'),
-                "links": [a.get_text(strip=True) for a in nav.find_all('a')]
-            }
-            navigation.append(nav_data)
+        async def map_page(page: Dict) -> Dict:
+            async with semaphore:
+                return await self.amap_semantic_schema(
+                    url=page["url"],
+                    html_content=page.get("html_content"),
+                    focus_elements=page.get("focus_elements"),
+                    structure_hash=page.get("structure_hash")
+                )
         
-        return {
-            "success": True,
-            "fallback": True,
-            "interactive_elements": interactive_elements[:50],
-            "navigation": navigation,
-            "headings": [h.get_text(strip=True) for h in soup.find_all(['h1', 'h2', 'h3'])]
-        }
+        schemas = await asyncio.gather(*[map_page(page) for page in pages])
+        logger.info(f"Mapped {len(schemas)} pages ({sum(1 for s in schemas if s.get('fallback'))} via fallback)")
+        return list(schemas)
+    
+    def map_many_sync(self, pages: List[Dict], max_concurrency: Optional[int] = None) -> List[Dict]:
+        return asyncio.run(self._map_many_and_close(pages, max_concurrency))
+    
+    async def _map_many_and_close(self, pages: List[Dict], max_concurrency: Optional[int]) -> List[Dict]:
+        try:
+            return await self.map_many(pages, max_concurrency)
+        finally:
+            await self.aclose()
+    
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+            self._async_client_loop = None
+    
+    def _fallback_schema_extraction(self, html_content: Optional[str]) -> Dict:
+        return extract_page_structure(html_content)
     
     def _extract_interactive_elements(self, response: Dict) -> list:
         if isinstance(response, dict) and "interactive_elements" in response:
@@ -0,0 +1,254 @@
+import asyncio
+import argparse
+import bisect
+import hashlib
+import json
+import os
+from array import array
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+from crawl4ai import AsyncWebCrawler
+from loguru import logger
+from integrations.crawl_scout import CrawlScout
+from utils.helpers import normalize_url, extract_domain, sanitize_filename
+
+
+SKIPPED_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".ico",
+    ".zip", ".gz", ".mp4", ".mp3", ".css", ".js", ".xml", ".json"
+)
+
+
+# Dedupe set that keeps an 8-byte digest per URL in a sorted typed array
+# (8 bytes per URL, no per-entry objects). Exact up to 64-bit digest collisions,
+# unlike a bloom filter, which would silently skip pages on false positives.
+class SeenSet:
+    
+    def __init__(self):
+        self._digests = array("Q")
+    
+    @staticmethod
+    def _digest(url: str) -> int:
+        return int.from_bytes(hashlib.blake2b(url.encode(), digest_size=8).digest(), "big")
+    
+    def add(self, url: str) -> bool:
+        digest = self._digest(url)
+        position = bisect.bisect_left(self._digests, digest)
+        if position < len(self._digests) and self._digests[position] == digest:
+            return False
+        self._digests.insert(position, digest)
+        return True
+    
+    def __contains__(self, url: str) -> bool:
+        digest = self._digest(url)
+        position = bisect.bisect_left(self._digests, digest)
+        return position < len(self._digests) and self._digests[position] == digest
+    
+    def __len__(self) -> int:
+        return len(self._digests)
+
+
+class SiteCrawler:
+    
+    def __init__(
+        self,
+        max_depth: int = 2,
+        max_pages: int = 50,
+        per_host_concurrency: int = 2,
+        respect_robots: bool = True,
+        user_agent: str = "HitlAI-SiteCrawler",
+        site_map_dir: str = "cache/site_maps"
+    ):
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.per_host_concurrency = per_host_concurrency
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+        self.site_map_dir = site_map_dir
+        
+        self.crawl_scout = CrawlScout()
+        self._robots: Dict[str, Optional[RobotFileParser]] = {}
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+    
+    async def crawl_site(self, start_url: str) -> Dict:
+        root = normalize_url(start_url)
+        root_host = urlsplit(root).netloc
+        logger.info(f"Starting site crawl for: {root} (depth {self.max_depth}, budget {self.max_pages} pages)")
+        
+        # Semaphores are bound to the running event loop, so recreate them per crawl
+        self._host_limits = defaultdict(lambda: asyncio.Semaphore(self.per_host_concurrency))
+        
+        seen = SeenSet()
+        seen.add(root)
+        frontier = [(root, None)]
+        pages: List[Dict] = []
+        skipped = {"robots": 0, "failed": 0, "budget": 0}
+        
+        async with AsyncWebCrawler(config=self.crawl_scout.browser_config) as crawler:
+            for depth in range(self.max_depth + 1):
+                if not frontier:
+                    break
+                
+                allowed = []
+                for url, parent in frontier:
+                    if await self._is_allowed(url):
+                        allowed.append((url, parent))
+                    else:
+                        skipped["robots"] += 1
+                
+                remaining = self.max_pages - len(pages)
+                if len(allowed) > remaining:
+                    skipped["budget"] += len(allowed) - remaining
+                    allowed = allowed[:remaining]
+                
+                results = await asyncio.gather(*[
+                    self._fetch(crawler, url) for url, _ in allowed
+                ])
+                
+                next_frontier = []
+                for (url, parent), scan in zip(allowed, results):
+                    if not scan.get("success"):
+                        skipped["failed"] += 1
+                        continue
+                    
+                    links = self._internal_links(url, scan.get("links", []), root_host)
+                    pages.append({
+                        "url": url,
+                        "depth": depth,
+                        "parent": parent,
+                        "title": scan.get("title", ""),
+                        "fingerprint": scan.get("fingerprint"),
+                        "links_out": len(links)
+                    })
+                    
+                    if depth < self.max_depth:
+                        for link in links:
+                            if seen.add(link):
+                                next_frontier.append((link, url))
+                
+                frontier = next_frontier
+                if len(pages) >= self.max_pages:
+                    skipped["budget"] += len(frontier)
+                    break
+        
+        site_map = {
+            "root": root,
+            "domain": extract_domain(root),
+            "crawled_at": datetime.utcnow().isoformat(),
+            "max_depth": self.max_depth,
+            "max_pages": self.max_pages,
+            "pages": pages,
+            "urls_seen": len(seen),
+            "skipped": skipped
+        }
+        
+        self.save_site_map(site_map)
+        logger.info(f"Site crawl completed: {len(pages)} pages mapped, {len(seen)} URLs seen")
+        return site_map
+    
+    def crawl_site_sync(self, start_url: str) -> Dict:
+        return asyncio.run(self.crawl_site(start_url))
+    
+    async def _fetch(self, crawler: AsyncWebCrawler, url: str) -> Dict:
+        async with self._host_limits[urlsplit(url).netloc]:
+            try:
+                return await self.crawl_scout.scan_with_crawler(crawler, url, screenshot=False)
+            except Exception as e:
+                logger.warning(f"Site crawl failed for {url}: {str(e)}")
+                return {"success": False, "error": str(e)}
+    
+    def _internal_links(self, page_url: str, links: List, root_host: str) -> List[str]:
+        internal = []
+        for link in links:
+            href = link.get("href", "") if isinstance(link, dict) else str(link)
+            if not href or href.startswith(("mailto:", "tel:", "javascript:")):
+                continue
+            
+            absolute = urljoin(page_url, href)
+            parts = urlsplit(absolute)
+            if parts.scheme not in ("http", "https") or parts.path.lower().endswith(SKIPPED_EXTENSIONS):
+                continue
+            
+            normalized = normalize_url(absolute)
+            if urlsplit(normalized).netloc == root_host:
+                internal.append(normalized)
+        
+        return internal
+    
+    async def _is_allowed(self, url: str) -> bool:
+        if not self.respect_robots:
+            return True
+        
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        
+        if origin not in self._robots:
+            parser = RobotFileParser(f"{origin}/robots.txt")
+            try:
+                await asyncio.to_thread(parser.read)
+            except Exception as e:
+                logger.warning(f"Could not read robots.txt for {origin}, allowing crawl: {str(e)}")
+                parser = None
+            self._robots[origin] = parser
+        
+        parser = self._robots[origin]
+        return parser is None or parser.can_fetch(self.user_agent, url)
+    
+    def _site_map_path(self, url: str) -> str:
+        return os.path.join(self.site_map_dir, f"{sanitize_filename(extract_domain(normalize_url(url)))}.json")
+    
+    def save_site_map(self, site_map: Dict) -> str:
+        os.makedirs(self.site_map_dir, exist_ok=True)
+        path = self._site_map_path(site_map["root"])
+        tmp_path = f"{path}.tmp"
+        
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(site_map, f, indent=2)
+        os.replace(tmp_path, path)
+        
+        logger.info(f"Site map saved to: {path}")
+        return path
+    
+    def load_site_map(self, url: str) -> Optional[Dict]:
+        path = self._site_map_path(url)
+        if not os.path.exists(path):
+            return None
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    @staticmethod
+    def summarize_site_map(site_map: Dict, limit: int = 40) -> str:
+        pages = sorted(site_map.get("pages", []), key=lambda p: (p["depth"], p["url"]))
+        lines = [
+            f"- {page['title'] or '(untitled)'}: {page['url']}"
+            for page in pages[:limit]
+        ]
+        if len(pages) > limit:
+            lines.append(f"- ... and {len(pages) - limit} more pages")
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl a site and save the site map used for mission planning")
+    parser.add_argument("url", help="Start URL (the crawl stays on its host)")
+    parser.add_argument("--max-depth", type=int, default=2)
+    parser.add_argument("--max-pages", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=2, help="Concurrent pages per host")
+    parser.add_argument("--ignore-robots", action="store_true", help="Do not honour robots.txt")
+    parser.add_argument("--site-map-dir", default="cache/site_maps")
+    args = parser.parse_args()
+    
+    site_map = SiteCrawler(
+        max_depth=args.max_depth,
+        max_pages=args.max_pages,
+        per_host_concurrency=args.concurrency,
+        respect_robots=not args.ignore_robots,
+        site_map_dir=args.site_map_dir
+    ).crawl_site_sync(args.url)
+    
+    print(f"Mapped {len(site_map['pages'])} pages ({site_map['urls_seen']} URLs seen, skipped {site_map['skipped']})")
+    print(SiteCrawler.summarize_site_map(site_map))
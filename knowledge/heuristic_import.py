@@ -0,0 +1,224 @@
+"""
+HeuristicImport - Stream large heuristic catalogs (JSONL or CSV) into a HeuristicLoader
+"""
+
+import csv
+import json
+import os
+import tempfile
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from loguru import logger
+import numpy as np
+from knowledge.heuristic_loader import HeuristicLoader, UXHeuristic
+
+
+REQUIRED_FIELDS = ('id', 'source', 'category', 'title', 'description')
+
+
+def iter_records(path: str, file_format: Optional[str] = None) -> Iterator[Tuple[int, Union[str, Dict[str, Any]]]]:
+    """
+    Yield (line number, raw record) from a JSONL or CSV file without loading it whole.
+    JSONL lines are yielded unparsed so one malformed line only rejects that record.
+    
+    Args:
+        path: File to read
+        file_format: 'jsonl' or 'csv' (default: from the file extension)
+    """
+    file_format = file_format or ('csv' if str(path).lower().endswith('.csv') else 'jsonl')
+    
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if file_format == 'csv':
+            # Line 1 is the header
+            for line_number, row in enumerate(csv.DictReader(f), 2):
+                yield line_number, row
+        elif file_format == 'jsonl':
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    yield line_number, line
+        else:
+            raise ValueError(f"Unsupported heuristic import format: {file_format}")
+
+
+def _parse_list(value: Any) -> List[str]:
+    # CSV cells hold either a JSON array or '|'-separated values
+    if value is None or value == '':
+        return []
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    value = str(value).strip()
+    if value.startswith('['):
+        return [str(item) for item in json.loads(value)]
+    return [item.strip() for item in value.split('|') if item.strip()]
+
+
+def _parse_relevance(value: Any) -> Dict[str, float]:
+    # CSV cells hold either a JSON object or 'persona:0.8|persona:0.5'
+    if value is None or value == '':
+        return {}
+    if isinstance(value, dict):
+        return {str(name): float(weight) for name, weight in value.items()}
+    value = str(value).strip()
+    if value.startswith('{'):
+        return {str(name): float(weight) for name, weight in json.loads(value).items()}
+    
+    relevance = {}
+    for pair in value.split('|'):
+        name, sep, weight = pair.partition(':')
+        if not sep:
+            raise ValueError(f"persona_relevance entry '{pair}' is not 'persona:weight'")
+        relevance[name.strip()] = float(weight)
+    return relevance
+
+
+def heuristic_from_record(record: Union[str, Dict[str, Any]]) -> UXHeuristic:
+    """Validate one raw record (JSON text or dict) into a UXHeuristic (raises ValueError on bad input)"""
+    if isinstance(record, str):
+        record = json.loads(record)
+    if not isinstance(record, dict):
+        raise ValueError(f"expected a JSON object, got {type(record).__name__}")
+    if None in record:
+        # csv.DictReader files cells beyond the header row under a None key
+        raise ValueError(f"row has {len(record[None])} extra unnamed columns")
+    
+    missing = [name for name in REQUIRED_FIELDS if not str(record.get(name) or '').strip()]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    
+    unknown = set(record) - {field.name for field in fields(UXHeuristic)}
+    if unknown:
+        raise ValueError(f"unknown fields {', '.join(sorted(unknown))}")
+    
+    severity_weight = float(record.get('severity_weight') or 0.5)
+    if not 0.0 <= severity_weight <= 1.0:
+        raise ValueError(f"severity_weight {severity_weight} is outside 0.0-1.0")
+    
+    return UXHeuristic(
+        id=str(record['id']).strip(),
+        source=str(record['source']).strip(),
+        category=str(record['category']).strip(),
+        title=str(record['title']).strip(),
+        description=str(record['description']).strip(),
+        context=_parse_list(record.get('context')),
+        severity_weight=severity_weight,
+        persona_relevance=_parse_relevance(record.get('persona_relevance')),
+        examples=_parse_list(record.get('examples')),
+        citation_url=str(record.get('citation_url') or '')
+    )
+
+
+def import_heuristics(
+    loader: HeuristicLoader,
+    path: str,
+    file_format: Optional[str] = None,
+    batch_size: int = 256,
+    max_workers: int = 4,
+    progress: Optional[Callable[[Dict[str, int]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Stream heuristics from a JSONL/CSV file into the loader.
+    
+    Records are validated and deduplicated by id (against the database and earlier
+    records in the file) as they are read, encoded in batches on a worker pool, and
+    spooled to a temporary file. The database and embedding store are only replaced
+    once every record has been processed, so a failed import leaves them untouched.
+    
+    Args:
+        loader: HeuristicLoader to import into
+        path: JSONL or CSV file of heuristic records
+        file_format: 'jsonl' or 'csv' (default: from the file extension)
+        batch_size: Heuristics per encode call
+        max_workers: Encode calls in flight at once
+        progress: Called with the running counts after each encoded batch
+    
+    Returns:
+        Counts of read, imported and duplicate records, plus failed [{line, error}]
+    """
+    stats = {'read': 0, 'imported': 0, 'duplicates': 0}
+    failed: List[Dict[str, Any]] = []
+    seen = {h.id for h in loader.heuristics}
+    imported: List[UXHeuristic] = []
+    
+    # Existing rows must be embedded before new ones are appended after them
+    dimension = loader.embeddings.shape[1] if len(loader.heuristics) else loader.embedding_service.dimension
+    
+    fd, spool_path = tempfile.mkstemp(dir=loader.knowledge_dir, suffix=".import.f32")
+    try:
+        with os.fdopen(fd, 'wb') as spool, ThreadPoolExecutor(max_workers=max_workers) as pool:
+            in_flight = []
+            
+            def submit(batch: List[UXHeuristic]):
+                texts = [loader._embedding_text(h) for h in batch]
+                in_flight.append((pool.submit(loader.embedding_service.embed, texts), len(batch)))
+                imported.extend(batch)
+            
+            def drain(limit: int):
+                # Write finished batches in submission order so rows line up with `imported`
+                while len(in_flight) > limit:
+                    future, count = in_flight.pop(0)
+                    encoded = np.asarray(future.result(), dtype=np.float32).reshape(count, dimension)
+                    spool.write(encoded.tobytes())
+                    stats['imported'] += count
+                    if progress:
+                        progress(dict(stats, failed=len(failed)))
+            
+            batch: List[UXHeuristic] = []
+            for line_number, record in iter_records(path, file_format):
+                stats['read'] += 1
+                try:
+                    heuristic = heuristic_from_record(record)
+                except (ValueError, TypeError) as e:
+                    failed.append({'line': line_number, 'error': str(e)})
+                    continue
+                
+                if heuristic.id in seen:
+                    stats['duplicates'] += 1
+                    continue
+                seen.add(heuristic.id)
+                
+                batch.append(heuristic)
+                if len(batch) >= batch_size:
+                    submit(batch)
+                    batch = []
+                    drain(max_workers)
+            
+            if batch:
+                submit(batch)
+            drain(0)
+        
+        if imported:
+            encoded = np.memmap(spool_path, dtype=np.float32, mode='r', shape=(len(imported), dimension))
+            loader._append_heuristics(imported, encoded)
+            del encoded
+    finally:
+        os.unlink(spool_path)
+    
+    logger.info(
+        f"Imported {stats['imported']} heuristics from {path} "
+        f"({stats['duplicates']} duplicates, {len(failed)} failed)"
+    )
+    return dict(stats, failed=failed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-import UX heuristics from JSONL or CSV")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default=None)
+    parser.add_argument("--knowledge-dir", default="knowledge")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    
+    result = import_heuristics(
+        HeuristicLoader(args.knowledge_dir),
+        args.path,
+        file_format=args.format,
+        batch_size=args.batch_size,
+        max_workers=args.workers,
+        progress=lambda counts: logger.info(f"Import progress: {counts}")
+    )
+    print(json.dumps({key: value for key, value in result.items() if key != 'failed'}, indent=2))
+    for failure in result['failed'][:20]:
+        print(f"line {failure['line']}: {failure['error']}")
@@ -4,12 +4,17 @@ HeuristicLoader - Load and manage UX heuristics from Baymard Institute and Niels
 
 import json
 import os
-from typing import List, Dict, Any, Optional
+import re
+import hashlib
+import tempfile
+import threading
+from typing import List, Dict, Any, Optional, Union
 from dataclasses import dataclass, asdict
 from pathlib import Path
 from loguru import logger
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from utils.embedding_service import get_embedding_service
+from memory.embedding_cache import EmbeddingCache
 
 
 @dataclass
@@ -32,17 +37,106 @@ class HeuristicLoader:
     Loads, manages, and retrieves UX heuristics with RAG-based semantic search.
     """
     
-    def __init__(self, knowledge_dir: str = "knowledge"):
+    def __init__(self, knowledge_dir: str = "knowledge", warm_up: bool = False, quantized: Optional[bool] = None):
+        """
+        Args:
+            knowledge_dir: Directory holding the heuristics database and embeddings
+            warm_up: Load the encoder and embeddings in a background thread now,
+                     instead of on the first semantic query
+            quantized: Search a memory-mapped int8 copy of the embeddings and re-rank
+                       candidates in float (default: HEURISTIC_EMBEDDINGS_QUANTIZED)
+        """
         self.knowledge_dir = Path(knowledge_dir)
         self.heuristics_file = self.knowledge_dir / "heuristics_db.json"
         self.embeddings_file = self.knowledge_dir / "heuristic_embeddings.npy"
+        self.embedding_keys_file = self.knowledge_dir / "heuristic_embeddings.keys.json"
+        self.quantized_file = self.knowledge_dir / "heuristic_embeddings.q8.npy"
+        self.quantized_scales_file = self.knowledge_dir / "heuristic_embeddings.q8_scales.npy"
+        self.quantized_meta_file = self.knowledge_dir / "heuristic_embeddings.q8.json"
+        
+        if quantized is None:
+            quantized = os.getenv("HEURISTIC_EMBEDDINGS_QUANTIZED", "false").lower() == "true"
+        self.quantized = quantized
         
         self.heuristics: List[UXHeuristic] = []
-        self.embeddings: Optional[np.ndarray] = None
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self._embeddings: Optional[np.ndarray] = None
+        self._embeddings_lock = threading.Lock()
+        self._embeddings_sha256: Optional[str] = None
+        self._quantized_embeddings: Optional[np.ndarray] = None
+        self._quantized_scales: Optional[np.ndarray] = None
+        self._persona_columns: Optional[Dict[str, int]] = None
+        self._persona_relevance_matrix: Optional[np.ndarray] = None
+        self._persona_known_matrix: Optional[np.ndarray] = None
+        self._category_index: Dict[str, List[int]] = {}
+        self._context_index: Dict[str, List[int]] = {}
+        self._persona_index: Dict[str, List[tuple]] = {}
+        
+        # The encoder is process-wide and only loaded on the first semantic query,
+        # so category/context lookups never pay for torch
+        self.embedding_service = get_embedding_service('all-MiniLM-L6-v2')
+        
+        # Query embeddings keyed by normalized text; audits of the same pages skip the encoder
+        self.query_cache = EmbeddingCache(
+            self.embedding_service.model_name,
+            max_size=int(os.getenv("HEURISTIC_QUERY_CACHE_SIZE", "1024")),
+            disk_path=os.getenv("HEURISTIC_QUERY_CACHE_PATH") or None
+        )
         
         self._ensure_knowledge_dir()
         self._load_or_initialize()
+        
+        if warm_up:
+            self.warm_up()
+    
+    @property
+    def embeddings(self) -> np.ndarray:
+        """Unit-length heuristic embeddings, generated on first access if not stored on disk"""
+        if self._embeddings is None:
+            with self._embeddings_lock:
+                if self._embeddings is None:
+                    self._generate_embeddings()
+        return self._embeddings
+    
+    @embeddings.setter
+    def embeddings(self, value: Optional[np.ndarray]):
+        self._embeddings = value
+        self._quantized_embeddings = None
+        self._quantized_scales = None
+        self._persona_columns = None
+    
+    def _build_persona_matrix(self):
+        """Heuristic x persona relevance, plus a mask of which heuristics rate each persona"""
+        personas = sorted({name for h in self.heuristics for name in h.persona_relevance})
+        columns = {name: column for column, name in enumerate(personas)}
+        
+        relevance = np.full((len(self.heuristics), len(personas)), 0.5, dtype=np.float32)
+        known = np.zeros((len(self.heuristics), len(personas)), dtype=bool)
+        for row, heuristic in enumerate(self.heuristics):
+            for name, weight in heuristic.persona_relevance.items():
+                relevance[row, columns[name]] = weight
+                known[row, columns[name]] = True
+        
+        self._persona_relevance_matrix = relevance
+        self._persona_known_matrix = known
+        self._persona_columns = columns
+    
+    def warm_up(self, background: bool = True) -> Optional[threading.Thread]:
+        """Load the encoder and heuristic embeddings ahead of the first query"""
+        def load():
+            try:
+                self.embedding_service.embed(["warm up"])
+                _ = self.embeddings
+                logger.info("Heuristic retrieval warmed up")
+            except Exception as e:
+                logger.warning(f"Heuristic warm-up failed: {str(e)}")
+        
+        if not background:
+            load()
+            return None
+        
+        thread = threading.Thread(target=load, name="heuristic-warm-up", daemon=True)
+        thread.start()
+        return thread
     
     def _ensure_knowledge_dir(self):
         """Create knowledge directory if it doesn't exist"""
@@ -57,6 +151,29 @@ class HeuristicLoader:
             self._initialize_default_heuristics()
             self._save_heuristics()
             logger.info("Initialized default heuristics database")
+        self._build_indexes()
+    
+    def _build_indexes(self):
+        """Build category, context-tag and persona-relevance indexes over heuristic rows"""
+        categories: Dict[str, List[int]] = {}
+        contexts: Dict[str, List[int]] = {}
+        personas: Dict[str, List[tuple]] = {}
+        
+        for row, heuristic in enumerate(self.heuristics):
+            categories.setdefault(heuristic.category.lower(), []).append(row)
+            for tag in {c.lower() for c in heuristic.context}:
+                contexts.setdefault(tag, []).append(row)
+            for name, relevance in heuristic.persona_relevance.items():
+                personas.setdefault(name, []).append((relevance, row))
+        
+        # Highest relevance first, so threshold queries stop at the first miss
+        for entries in personas.values():
+            entries.sort(key=lambda entry: (-entry[0], entry[1]))
+        
+        self._category_index = categories
+        self._context_index = contexts
+        self._persona_index = personas
+        self._persona_columns = None
     
     def _initialize_default_heuristics(self):
         """Initialize with curated Baymard + NN/g heuristics"""
@@ -290,26 +407,233 @@ class HeuristicLoader:
         ]
         
         self.heuristics = baymard_heuristics + nng_heuristics
-        self._generate_embeddings()
+        self.embeddings = None
+    
+    @staticmethod
+    def _embedding_text(heuristic: UXHeuristic) -> str:
+        return f"{heuristic.title}. {heuristic.description}. Context: {', '.join(heuristic.context)}"
+    
+    def _embedding_key(self, heuristic: UXHeuristic) -> str:
+        """Content hash of the embedded text and the model that embedded it"""
+        text = self._embedding_text(heuristic)
+        return hashlib.sha256(f"{self.embedding_service.model_name}\x00{text}".encode()).hexdigest()
+    
+    def _atomic_write(self, path: Path, write):
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    
+    @staticmethod
+    def _unit_rows(rows: np.ndarray) -> np.ndarray:
+        """float32 rows scaled to unit length (zero rows are left as-is)"""
+        rows = np.asarray(rows, dtype=np.float32)
+        norms = np.linalg.norm(rows, axis=1, keepdims=True)
+        return rows / np.where(norms == 0, 1.0, norms)
+    
+    @staticmethod
+    def _file_sha256(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def _load_stored_embeddings(self) -> tuple:
+        """
+        Stored (keys, memory-mapped matrix, rows already unit-length); files that fail
+        validation are ignored. Mapping instead of reading lets worker processes share the pages.
+        """
+        if not (self.embeddings_file.exists() and self.embedding_keys_file.exists()):
+            return [], None, False
+        
+        try:
+            with open(self.embedding_keys_file, 'r', encoding='utf-8') as f:
+                sidecar = json.load(f)
+            checksum = self._file_sha256(self.embeddings_file)
+            embeddings = np.load(self.embeddings_file, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable heuristic embeddings: {str(e)}")
+            return [], None, False
+        
+        if sidecar.get('sha256') != checksum or len(sidecar.get('keys', [])) != len(embeddings):
+            logger.warning("Heuristic embeddings do not match their key file, re-encoding")
+            return [], None, False
+        
+        self._embeddings_sha256 = checksum
+        return sidecar['keys'], embeddings, bool(sidecar.get('normalized'))
+    
+    def _save_embeddings(self, keys: List[str]):
+        """
+        Write embeddings and their content keys (each file replaced atomically).
+        Rows are stored unit-length, so cosine similarity is a plain dot product.
+        """
+        self._atomic_write(self.embeddings_file, lambda f: np.save(f, self._unit_rows(self._embeddings)))
+        self._write_embedding_keys(keys)
+    
+    def _write_embedding_keys(self, keys: List[str]):
+        """Record the checksum and content keys of the embeddings file, then map it"""
+        checksum = self._file_sha256(self.embeddings_file)
+        self._embeddings_sha256 = checksum
+        
+        sidecar = {'model': self.embedding_service.model_name, 'sha256': checksum, 'normalized': True, 'keys': keys}
+        self._atomic_write(
+            self.embedding_keys_file,
+            lambda f: f.write(json.dumps(sidecar).encode('utf-8'))
+        )
+        
+        # Reopen as a read-only mapping so the in-memory copy can be released
+        self.embeddings = np.load(self.embeddings_file, mmap_mode='r')
     
     def _generate_embeddings(self):
-        """Generate embeddings for all heuristics"""
-        texts = [
-            f"{h.title}. {h.description}. Context: {', '.join(h.context)}"
-            for h in self.heuristics
-        ]
-        self.embeddings = self.embedding_model.encode(texts, convert_to_numpy=True)
+        """Build the embedding matrix, encoding only heuristics whose text or model changed"""
+        keys = [self._embedding_key(h) for h in self.heuristics]
+        stored_keys, stored_matrix, normalized = self._load_stored_embeddings()
+        
+        # Unchanged database: use the stored matrix as-is (files from before rows were
+        # stored unit-length are rewritten once below, without re-encoding)
+        if keys and stored_keys == keys and normalized:
+            self.embeddings = stored_matrix
+            logger.info(f"Embeddings ready for {len(keys)} heuristics (0 encoded)")
+            return
+        
+        stored = {key: stored_matrix[row] for row, key in enumerate(stored_keys)}
+        missing = [i for i, key in enumerate(keys) if key not in stored]
+        if missing:
+            encoded = self.embedding_service.embed(
+                [self._embedding_text(self.heuristics[i]) for i in missing], normalize=True
+            )
+            stored.update({keys[i]: row for i, row in zip(missing, encoded)})
         
-        # Save embeddings
-        np.save(self.embeddings_file, self.embeddings)
-        logger.info(f"Generated embeddings for {len(self.heuristics)} heuristics")
+        if keys:
+            self.embeddings = np.stack([stored[key] for key in keys]).astype(np.float32)
+        else:
+            self.embeddings = np.zeros((0, self.embedding_service.dimension), dtype=np.float32)
+        
+        # Rows were added, reordered, or stale rows for edited/removed heuristics were dropped
+        self._save_embeddings(keys)
+        logger.info(f"Embeddings ready for {len(keys)} heuristics ({len(missing)} encoded)")
+    
+    def _quantized_matrix(self) -> tuple:
+        """Memory-mapped int8 embeddings and per-row scales, rebuilt when the float matrix changes"""
+        if self._quantized_embeddings is not None:
+            return self._quantized_embeddings, self._quantized_scales
+        
+        embeddings = self.embeddings
+        if self._embeddings_sha256 is None:
+            self._save_embeddings([self._embedding_key(h) for h in self.heuristics])
+            embeddings = self._embeddings
+        
+        meta = None
+        if self.quantized_meta_file.exists() and self.quantized_file.exists() and self.quantized_scales_file.exists():
+            with open(self.quantized_meta_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        
+        if not meta or meta.get('source_sha256') != self._embeddings_sha256:
+            self._write_quantized(embeddings)
+        
+        self._quantized_embeddings = np.load(self.quantized_file, mmap_mode='r')
+        self._quantized_scales = np.load(self.quantized_scales_file, mmap_mode='r')
+        return self._quantized_embeddings, self._quantized_scales
+    
+    def _write_quantized(self, embeddings: np.ndarray, chunk_size: int = 4096):
+        """Symmetric int8 quantization of the unit-length rows, one scale per row"""
+        quantized = np.empty(embeddings.shape, dtype=np.int8)
+        scales = np.empty(len(embeddings), dtype=np.float32)
+        
+        for start in range(0, len(embeddings), chunk_size):
+            rows = np.asarray(embeddings[start:start + chunk_size], dtype=np.float32)
+            row_scales = np.abs(rows).max(axis=1) / 127.0
+            row_scales[row_scales == 0] = 1.0
+            quantized[start:start + chunk_size] = np.round(rows / row_scales[:, None]).astype(np.int8)
+            scales[start:start + chunk_size] = row_scales
+        
+        self._atomic_write(self.quantized_file, lambda f: np.save(f, quantized))
+        self._atomic_write(self.quantized_scales_file, lambda f: np.save(f, scales))
+        meta = {'source_sha256': self._embeddings_sha256, 'rows': len(embeddings)}
+        self._atomic_write(self.quantized_meta_file, lambda f: f.write(json.dumps(meta).encode('utf-8')))
+        logger.info(f"Wrote int8 heuristic embeddings for {len(embeddings)} rows")
+    
+    def _cosine_scores(self, row_ids: np.ndarray, queries: np.ndarray, chunk_size: int = 4096) -> np.ndarray:
+        """
+        Cosine similarities (heuristics, contexts) read straight from the memory-mapped
+        unit-length rows, a chunk at a time so no float copy of the matrix is kept
+        
+        Args:
+            row_ids: Heuristic rows to score
+            queries: Unit-length query embeddings
+            chunk_size: Rows gathered per step
+        """
+        embeddings = self.embeddings
+        similarities = np.empty((len(row_ids), queries.shape[0]), dtype=np.float32)
+        for start in range(0, len(row_ids), chunk_size):
+            similarities[start:start + chunk_size] = embeddings[row_ids[start:start + chunk_size]] @ queries.T
+        return similarities
+    
+    def _candidate_scores(self, row_ids: np.ndarray, queries: np.ndarray, n_candidates: int) -> List[tuple]:
+        """Per query: (rows, cosine similarities) of the n_candidates most similar heuristics"""
+        if not self.quantized:
+            similarities = self._cosine_scores(row_ids, queries)
+            candidates = np.argpartition(-similarities, n_candidates - 1, axis=0)[:n_candidates]
+            return [
+                (row_ids[candidates[:, column]], similarities[candidates[:, column], column])
+                for column in range(queries.shape[0])
+            ]
+        
+        # Approximate scores on the int8 matrix (in chunks to bound temporary memory),
+        # then exact float similarities for a shortlist
+        quantized, scales = self._quantized_matrix()
+        approximate = np.empty((len(row_ids), queries.shape[0]), dtype=np.float32)
+        for start in range(0, len(row_ids), 4096):
+            chunk = row_ids[start:start + 4096]
+            approximate[start:start + 4096] = (
+                np.asarray(quantized[chunk], dtype=np.float32) @ queries.T
+            ) * np.asarray(scales[chunk])[:, None]
+        
+        n_shortlist = min(len(row_ids), max(n_candidates * 4, 64))
+        shortlist = np.argpartition(-approximate, n_shortlist - 1, axis=0)[:n_shortlist]
+        
+        results = []
+        for column in range(queries.shape[0]):
+            rows = row_ids[shortlist[:, column]]
+            exact = self._cosine_scores(rows, queries[column:column + 1])[:, 0]
+            best = np.argpartition(-exact, n_candidates - 1)[:n_candidates]
+            results.append((rows[best], exact[best]))
+        return results
+    
+    @staticmethod
+    def _normalize_query(text: str) -> str:
+        # The MiniLM encoder is uncased, so case and whitespace do not change the embedding
+        return re.sub(r'\s+', ' ', text).strip().lower()
+    
+    def _embed_queries(self, ui_contexts: List[str]) -> np.ndarray:
+        """Unit-length query embeddings, encoding only texts missing from the query cache"""
+        texts = [self._normalize_query(text) for text in ui_contexts]
+        cached = {text: self.query_cache.get(text) for text in set(texts)}
+        
+        missing = [text for text, embedding in cached.items() if embedding is None]
+        if missing:
+            for text, embedding in zip(missing, self.embedding_service.embed(missing, normalize=True)):
+                cached[text] = embedding
+                self.query_cache.set(text, embedding.tolist())
+        
+        return np.asarray([cached[text] for text in texts], dtype=np.float32)
+    
+    def get_query_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss statistics of the query-embedding cache"""
+        return self.query_cache.get_stats()
     
     def get_relevant_guidelines(
         self,
         ui_context: str,
         persona_name: str = None,
         top_k: int = 5,
-        min_similarity: float = 0.3
+        min_similarity: float = 0.3,
+        filters: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """
         Retrieve the most relevant UX guidelines for the current UI context.
@@ -319,67 +643,154 @@ class HeuristicLoader:
             persona_name: Name of persona to weight relevance
             top_k: Number of guidelines to return
             min_similarity: Minimum similarity threshold
-            
+            filters: Optional find_rows filters restricting the candidate set
+        
         Returns:
             List of relevant guidelines with scores
         """
-        # Generate embedding for query
-        query_embedding = self.embedding_model.encode([ui_context], convert_to_numpy=True)[0]
+        return self.get_relevant_guidelines_batch(
+            [ui_context], persona_name, top_k=top_k, min_similarity=min_similarity, filters=filters
+        )[0]
+    
+    def get_relevant_guidelines_batch(
+        self,
+        ui_contexts: List[str],
+        personas: Union[str, List[Optional[str]], None] = None,
+        top_k: int = 5,
+        min_similarity: float = 0.3,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve relevant guidelines for many UI contexts with one encode call
+        and one matrix multiply.
         
-        # Calculate cosine similarity
-        similarities = np.dot(self.embeddings, query_embedding) / (
-            np.linalg.norm(self.embeddings, axis=1) * np.linalg.norm(query_embedding)
-        )
+        Args:
+            ui_contexts: Descriptions of screens/pages
+            personas: One persona name for all contexts, or one per context
+            top_k: Number of guidelines to return per context
+            min_similarity: Minimum similarity threshold
+            filters: Optional find_rows filters restricting the candidate set
+        
+        Returns:
+            One list of guidelines (as in get_relevant_guidelines) per context
+        """
+        if not ui_contexts:
+            return []
+        if personas is None or isinstance(personas, str):
+            personas = [personas] * len(ui_contexts)
+        
+        queries = self._embed_queries(ui_contexts)
+        
+        # Filters shrink the candidate set before any similarity is computed
+        if filters:
+            row_ids = np.asarray(self.find_rows(**filters), dtype=np.int64)
+        else:
+            row_ids = np.arange(len(self.heuristics))
+        
+        # Candidates are the top 2*k by raw similarity, re-ranked after persona weighting
+        n_candidates = min(top_k * 2, len(row_ids))
+        if n_candidates == 0:
+            return [[] for _ in ui_contexts]
+        candidate_scores = self._candidate_scores(row_ids, queries, n_candidates)
         
-        # Get top-k indices
-        top_indices = np.argsort(similarities)[::-1][:top_k * 2]  # Get more for filtering
+        if self._persona_columns is None:
+            self._build_persona_matrix()
         
         results = []
-        for idx in top_indices:
-            if similarities[idx] < min_similarity:
-                continue
-                
-            heuristic = self.heuristics[idx]
-            score = float(similarities[idx])
+        for (rows, scores), persona_name in zip(candidate_scores, personas):
+            keep = scores >= min_similarity
+            rows, scores = rows[keep], scores[keep]
             
-            # Apply persona weighting if specified
-            if persona_name and persona_name in heuristic.persona_relevance:
-                persona_weight = heuristic.persona_relevance[persona_name]
-                weighted_score = score * (0.7 + 0.3 * persona_weight)  # 70% similarity, 30% persona
+            persona_column = self._persona_columns.get(persona_name) if persona_name else None
+            if persona_column is not None:
+                relevance = self._persona_relevance_matrix[rows, persona_column]
+                known = self._persona_known_matrix[rows, persona_column]
+                # 70% similarity, 30% persona where the heuristic rates this persona
+                weighted = np.where(known, scores * (0.7 + 0.3 * relevance), scores)
             else:
-                weighted_score = score
+                relevance = np.full(len(rows), 0.5, dtype=np.float32)
+                weighted = scores
             
-            results.append({
-                'heuristic': asdict(heuristic),
-                'similarity_score': score,
-                'weighted_score': weighted_score,
-                'persona_relevance': heuristic.persona_relevance.get(persona_name, 0.5) if persona_name else None
-            })
+            order = np.argsort(-weighted, kind="stable")[:top_k]
+            results.append([
+                {
+                    'heuristic': asdict(self.heuristics[rows[i]]),
+                    'similarity_score': float(scores[i]),
+                    'weighted_score': float(weighted[i]),
+                    'persona_relevance': float(relevance[i]) if persona_name else None
+                }
+                for i in order
+            ])
+        
+        return results
+    
+    def find_rows(
+        self,
+        category: Optional[str] = None,
+        context: Union[str, List[str], None] = None,
+        persona_name: Optional[str] = None,
+        min_relevance: Optional[float] = None,
+        source: Optional[str] = None
+    ) -> List[int]:
+        """
+        Rows matching all given filters (in database order).
+        
+        Args:
+            category: Category name (case-insensitive)
+            context: Context tag, or list of tags that must all be present
+            persona_name: Persona whose relevance must be >= min_relevance
+            min_relevance: Relevance threshold for persona_name (default 0.7)
+            source: 'baymard', 'nng', ...
+        """
+        selected: Optional[set] = None
+        
+        def narrow(rows):
+            nonlocal selected
+            selected = set(rows) if selected is None else selected & set(rows)
+        
+        if category is not None:
+            narrow(self._category_index.get(category.lower(), []))
+        if context is not None:
+            for tag in ([context] if isinstance(context, str) else context):
+                narrow(self._context_index.get(tag.lower(), []))
+        if persona_name is not None:
+            threshold = 0.7 if min_relevance is None else min_relevance
+            rows = []
+            for relevance, row in self._persona_index.get(persona_name, []):
+                if relevance < threshold:
+                    break
+                rows.append(row)
+            narrow(rows)
         
-        # Sort by weighted score and return top-k
-        results.sort(key=lambda x: x['weighted_score'], reverse=True)
-        return results[:top_k]
+        if selected is None:
+            selected = range(len(self.heuristics))
+        if source is not None:
+            selected = [row for row in selected if self.heuristics[row].source == source]
+        return sorted(selected)
+    
+    def find(self, **filters) -> List[UXHeuristic]:
+        """Heuristics matching all filters of find_rows (e.g. context='checkout', persona_name=..., min_relevance=0.8)"""
+        return [self.heuristics[row] for row in self.find_rows(**filters)]
     
     def get_by_category(self, category: str) -> List[UXHeuristic]:
         """Get all heuristics in a specific category"""
-        return [h for h in self.heuristics if h.category.lower() == category.lower()]
+        return self.find(category=category)
     
     def get_by_context(self, context: str) -> List[UXHeuristic]:
         """Get all heuristics relevant to a specific context"""
-        return [h for h in self.heuristics if context.lower() in [c.lower() for c in h.context]]
+        return self.find(context=context)
     
     def get_high_priority_for_persona(self, persona_name: str, min_relevance: float = 0.7) -> List[UXHeuristic]:
         """Get high-priority heuristics for a specific persona"""
-        return [
-            h for h in self.heuristics
-            if h.persona_relevance.get(persona_name, 0) >= min_relevance
-        ]
+        return self.find(persona_name=persona_name, min_relevance=min_relevance)
     
     def _save_heuristics(self):
-        """Save heuristics to JSON file"""
+        """Save heuristics to JSON file (atomically)"""
         data = [asdict(h) for h in self.heuristics]
-        with open(self.heuristics_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        self._atomic_write(
+            self.heuristics_file,
+            lambda f: f.write(json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8'))
+        )
         logger.info(f"Saved {len(self.heuristics)} heuristics to {self.heuristics_file}")
     
     def _load_heuristics(self):
@@ -388,19 +799,82 @@ class HeuristicLoader:
             data = json.load(f)
         
         self.heuristics = [UXHeuristic(**item) for item in data]
-        
-        # Load embeddings if available
-        if self.embeddings_file.exists():
-            self.embeddings = np.load(self.embeddings_file)
-        else:
-            self._generate_embeddings()
+        # Embeddings are matched to heuristics by content key on first query
+    
+    def import_heuristics(self, path: str, **kwargs) -> Dict[str, Any]:
+        """Stream heuristics from a JSONL/CSV file (see knowledge.heuristic_import)"""
+        from knowledge.heuristic_import import import_heuristics
+        return import_heuristics(self, path, **kwargs)
     
     def add_custom_heuristic(self, heuristic: UXHeuristic):
-        """Add a custom heuristic to the database"""
-        self.heuristics.append(heuristic)
-        self._generate_embeddings()
-        self._save_heuristics()
+        """
+        Add a custom heuristic to the database.
+        
+        Each call rewrites the embedding matrix, its key file and the database, so the
+        cost grows with the database size. Add many heuristics in one
+        add_custom_heuristics call, or stream them with import_heuristics.
+        """
+        self.add_custom_heuristics([heuristic])
         logger.info(f"Added custom heuristic: {heuristic.id}")
+    
+    def add_custom_heuristics(self, heuristics: List[UXHeuristic]):
+        """
+        Add several heuristics, encoding only the new ones and writing each file once.
+        
+        Writing is O(database size) per call regardless of how many heuristics are
+        added, so batch additions instead of calling this (or add_custom_heuristic)
+        in a loop; import_heuristics streams large catalogs the same way.
+        """
+        if not heuristics:
+            return
+        
+        # If embeddings are not loaded yet, the new rows are encoded on first query
+        if self._embeddings is not None:
+            encoded = self.embedding_service.embed([self._embedding_text(h) for h in heuristics])
+            self._append_heuristics(heuristics, np.asarray(encoded, dtype=np.float32))
+            return
+        
+        self.heuristics.extend(heuristics)
+        self._build_indexes()
+        self._save_heuristics()
+    
+    def _append_heuristics(self, heuristics: List[UXHeuristic], encoded: np.ndarray, chunk_size: int = 8192):
+        """
+        Append already-encoded heuristics to the embedding store and database.
+        Existing rows are already unit-length; the new ones are normalized as they are written.
+        
+        The new matrix is written in chunks next to the old one and swapped in, then the
+        key file (with a checksum of the whole matrix) and database are replaced, so
+        every call costs a full copy of the store; callers should append in batches. Embeddings are matched by content key, so a
+        crash between the steps costs at most a re-encode, never a mismatched row.
+        """
+        existing = self.embeddings if self.heuristics else None
+        with self._embeddings_lock:
+            n_existing = 0 if existing is None else len(existing)
+            shape = (n_existing + len(encoded), encoded.shape[1])
+            
+            fd, tmp_path = tempfile.mkstemp(dir=self.knowledge_dir, suffix=".tmp")
+            os.close(fd)
+            try:
+                matrix = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=shape)
+                for start in range(0, n_existing, chunk_size):
+                    end = min(start + chunk_size, n_existing)
+                    matrix[start:end] = existing[start:end]
+                for start in range(0, len(encoded), chunk_size):
+                    end = min(start + chunk_size, len(encoded))
+                    matrix[n_existing + start:n_existing + end] = self._unit_rows(encoded[start:end])
+                matrix.flush()
+                del matrix
+                os.replace(tmp_path, self.embeddings_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            
+            self.heuristics.extend(heuristics)
+            self._write_embedding_keys([self._embedding_key(h) for h in self.heuristics])
+        
+        self._build_indexes()
+        self._save_heuristics()
 
 
 # Example usage
@@ -9,6 +9,7 @@ Features:
 - Structured data extraction
 - Anti-bot bypass
 - LLM-friendly output
+- Request coalescing (identical concurrent crawls share one render)
 """
 
 import asyncio
@@ -20,6 +21,8 @@ from crawl4ai.chunking_strategy import RegexChunking
 from pydantic import BaseModel
 import os
 from dotenv import load_dotenv
+from utils.single_flight import SingleFlight
+from utils.helpers import normalize_url
 
 load_dotenv()
 
@@ -41,6 +44,7 @@ class Crawl4AIService:
     
     def __init__(self):
         self.crawler = None
+        self._crawl_flight = SingleFlight("crawl4ai")
     
     async def initialize(self):
         """Initialize the async crawler"""
@@ -79,6 +83,25 @@ class Crawl4AIService:
         Returns:
             CrawlResult with markdown, HTML, and metadata
         """
+        key = json.dumps([
+            normalize_url(url), wait_for, screenshot, extract_links, wait_time
+        ])
+        
+        # Identical requests already rendering share that render's result
+        return await self._crawl_flight.do(
+            key,
+            lambda: self._crawl_page(url, wait_for, screenshot, extract_links, wait_time)
+        )
+    
+    async def _crawl_page(
+        self,
+        url: str,
+        wait_for: Optional[str],
+        screenshot: bool,
+        extract_links: bool,
+        wait_time: int
+    ) -> CrawlResult:
+        """Render the page (called once per coalesced group of requests)"""
         try:
             await self.initialize()
             
@@ -134,7 +157,7 @@ class Crawl4AIService:
                 links=links,
                 metadata=metadata
             )
-            
+        
         except Exception as e:
             return CrawlResult(
                 success=False,
@@ -145,6 +168,10 @@ class Crawl4AIService:
                 error=str(e)
             )
     
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get request coalescing metrics"""
+        return self._crawl_flight.get_metrics()
+    
     async def crawl_with_extraction(
         self,
         url: str,
@@ -194,7 +221,7 @@ class Crawl4AIService:
                     "crawl_time": result.crawl_time
                 }
             }
-            
+        
         except Exception as e:
             return {
                 "success": False,
@@ -310,6 +337,11 @@ async def interactive_elements_endpoint(url: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Request coalescing metrics"""
+    return {"service": "crawl4ai", "coalescing": service.get_metrics()}
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
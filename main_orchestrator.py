@@ -61,6 +61,9 @@ class PerformileOrchestrator:
             "persona": persona,
             "persona_config": None,
             "crawl_context": None,
+            "page_html": None,
+            "page_fingerprint": None,
+            "page_structure_hash": None,
             "semantic_schema": None,
             "current_mission": mission,
             "mission_steps": [],
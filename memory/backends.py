@@ -0,0 +1,412 @@
+import os
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from loguru import logger
+
+
+def matches_filter(metadata: Dict, filter_dict: Optional[Dict]) -> bool:
+    # Subset of Pinecone's filter language: {"field": value}, {"field": {"$eq"|"$ne"|"$in"|"$nin": ...}}
+    if not filter_dict:
+        return True
+    for field, condition in filter_dict.items():
+        value = metadata.get(field)
+        if isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op == "$eq" and value != operand:
+                    return False
+                if op == "$ne" and value == operand:
+                    return False
+                if op == "$in" and value not in operand:
+                    return False
+                if op == "$nin" and value in operand:
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+class VectorBackend(ABC):
+    
+    # Storage interface used by VectorMemoryStore. Query results are
+    # [{"id", "score", "metadata"}] ordered by descending cosine similarity.
+    
+    @abstractmethod
+    def upsert(self, vectors: List[Tuple[str, List[float], Dict]]):
+        ...
+    
+    @abstractmethod
+    def query(self, vector: List[float], top_k: int, filter: Optional[Dict] = None) -> List[Dict]:
+        ...
+    
+    @abstractmethod
+    def fetch(self, ids: List[str]) -> Dict[str, Dict]:
+        ...
+    
+    @abstractmethod
+    def fetch_vectors(self, ids: List[str]) -> Dict[str, List[float]]:
+        ...
+    
+    @abstractmethod
+    def update_metadata(self, vector_id: str, metadata: Dict):
+        ...
+    
+    @abstractmethod
+    def delete(self, ids: List[str]):
+        ...
+    
+    @abstractmethod
+    def list_ids(self) -> Iterator[str]:
+        ...
+
+
+class PineconeBackend(VectorBackend):
+    
+    def __init__(self, dimension: int = 1536):
+        from pinecone import Pinecone, ServerlessSpec
+        
+        self.api_key = os.getenv("PINECONE_API_KEY")
+        self.environment = os.getenv("PINECONE_ENVIRONMENT", "gcp-starter")
+        self.index_name = os.getenv("PINECONE_INDEX_NAME", "performile-memory")
+        
+        self.pc = Pinecone(api_key=self.api_key)
+        existing_indexes = [index.name for index in self.pc.list_indexes()]
+        
+        if self.index_name not in existing_indexes:
+            logger.info(f"Creating new Pinecone index: {self.index_name}")
+            self.pc.create_index(
+                name=self.index_name,
+                dimension=dimension,
+                metric="cosine",
+                spec=ServerlessSpec(
+                    cloud="aws",
+                    region="us-east-1"
+                )
+            )
+        
+        self.index = self.pc.Index(self.index_name)
+        logger.info(f"Connected to Pinecone index: {self.index_name}")
+    
+    def upsert(self, vectors: List[Tuple[str, List[float], Dict]]):
+        self.index.upsert(vectors=vectors)
+    
+    def query(self, vector: List[float], top_k: int, filter: Optional[Dict] = None) -> List[Dict]:
+        results = self.index.query(
+            vector=vector,
+            top_k=top_k,
+            include_metadata=True,
+            filter=filter or None
+        )
+        return [
+            {"id": match.id, "score": match.score, "metadata": match.metadata}
+            for match in results.matches
+        ]
+    
+    def fetch(self, ids: List[str]) -> Dict[str, Dict]:
+        if not ids:
+            return {}
+        vectors = self.index.fetch(ids=ids).vectors
+        return {vector_id: dict(vector.metadata or {}) for vector_id, vector in vectors.items()}
+    
+    def fetch_vectors(self, ids: List[str]) -> Dict[str, List[float]]:
+        if not ids:
+            return {}
+        vectors = self.index.fetch(ids=ids).vectors
+        return {vector_id: list(vector.values) for vector_id, vector in vectors.items()}
+    
+    def update_metadata(self, vector_id: str, metadata: Dict):
+        self.index.update(id=vector_id, set_metadata=metadata)
+    
+    def delete(self, ids: List[str]):
+        if ids:
+            self.index.delete(ids=ids)
+    
+    def list_ids(self) -> Iterator[str]:
+        # Paginated id listing (serverless indexes only)
+        for page in self.index.list():
+            yield from page
+
+
+class LocalVectorBackend(VectorBackend):
+    
+    # Offline backend: an append-only memory-mapped vector file (unit-normalized rows,
+    # float32 or float16) plus a JSONL sidecar logging upserts, metadata updates and
+    # deletes. Replaced or deleted rows stay in the file and are masked out.
+    # Searches are exact below ivf_threshold live rows; above it an IVF index
+    # (k-means coarse quantizer) probes the nprobe nearest lists instead.
+    
+    def __init__(
+        self,
+        directory: str = "cache/memory",
+        dimension: int = 1536,
+        dtype: str = "float32",
+        ivf_threshold: int = 20000,
+        nprobe: int = 8
+    ):
+        self.directory = directory
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype)
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        
+        os.makedirs(directory, exist_ok=True)
+        self.vectors_path = os.path.join(directory, f"vectors.{self.dtype.name}")
+        self.metadata_path = os.path.join(directory, "metadata.jsonl")
+        
+        self._lock = threading.RLock()
+        self._row_ids: List[Optional[str]] = []
+        self._row_metadata: List[Optional[Dict]] = []
+        self._rows: Dict[str, int] = {}
+        self._matrix = None
+        self._ivf = None
+        
+        self._load()
+        logger.info(f"Local vector store at {directory}: {len(self._rows)} vectors")
+    
+    def _load(self):
+        row_size = self.dimension * self.dtype.itemsize
+        stored_rows = os.path.getsize(self.vectors_path) // row_size if os.path.exists(self.vectors_path) else 0
+        self._row_ids = [None] * stored_rows
+        self._row_metadata = [None] * stored_rows
+        
+        if os.path.exists(self.metadata_path):
+            with open(self.metadata_path, "r") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn final line from an interrupted write
+                        continue
+                    self._apply(entry)
+        
+        # Rows written to the vector file without a metadata entry are never visible
+        self._row_ids = self._row_ids[:stored_rows]
+        self._row_metadata = self._row_metadata[:stored_rows]
+        self._rows = {vector_id: row for vector_id, row in self._rows.items() if row < stored_rows}
+    
+    def _apply(self, entry: Dict):
+        op = entry.get("op")
+        vector_id = entry["id"]
+        
+        if op == "upsert":
+            row = entry["row"]
+            while len(self._row_ids) <= row:
+                self._row_ids.append(None)
+                self._row_metadata.append(None)
+            previous = self._rows.get(vector_id)
+            if previous is not None:
+                self._row_ids[previous] = None
+                self._row_metadata[previous] = None
+            self._rows[vector_id] = row
+            self._row_ids[row] = vector_id
+            self._row_metadata[row] = entry.get("metadata") or {}
+        elif op == "update":
+            row = self._rows.get(vector_id)
+            if row is not None:
+                # Replaced, never mutated in place, so query snapshots stay consistent
+                self._row_metadata[row] = {**self._row_metadata[row], **(entry.get("metadata") or {})}
+        elif op == "delete":
+            row = self._rows.pop(vector_id, None)
+            if row is not None:
+                self._row_ids[row] = None
+                self._row_metadata[row] = None
+    
+    def _log(self, entries: List[Dict]):
+        with open(self.metadata_path, "a") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def _get_matrix(self) -> np.ndarray:
+        rows = len(self._row_ids)
+        if self._matrix is None or self._matrix.shape[0] != rows:
+            if rows == 0:
+                self._matrix = np.zeros((0, self.dimension), dtype=self.dtype)
+            else:
+                self._matrix = np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(rows, self.dimension))
+        return self._matrix
+    
+    def upsert(self, vectors: List[Tuple[str, List[float], Dict]]):
+        if not vectors:
+            return
+        
+        batch = np.asarray([vector for _, vector, _ in vectors], dtype=np.float32)
+        if batch.ndim != 2 or batch.shape[1] != self.dimension:
+            raise ValueError(f"Expected vectors of dimension {self.dimension}, got {batch.shape}")
+        norms = np.linalg.norm(batch, axis=1, keepdims=True)
+        batch = batch / np.where(norms == 0, 1.0, norms)
+        
+        with self._lock:
+            first_row = len(self._row_ids)
+            with open(self.vectors_path, "ab") as f:
+                f.write(batch.astype(self.dtype).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            
+            entries = [
+                {"op": "upsert", "id": vector_id, "row": first_row + offset, "metadata": metadata}
+                for offset, (vector_id, _, metadata) in enumerate(vectors)
+            ]
+            self._log(entries)
+            for entry in entries:
+                self._apply(entry)
+    
+    def fetch(self, ids: List[str]) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                vector_id: dict(self._row_metadata[self._rows[vector_id]])
+                for vector_id in ids if vector_id in self._rows
+            }
+    
+    def fetch_vectors(self, ids: List[str]) -> Dict[str, List[float]]:
+        with self._lock:
+            matrix = self._get_matrix()
+            return {
+                vector_id: matrix[self._rows[vector_id]].astype(np.float32).tolist()
+                for vector_id in ids if vector_id in self._rows
+            }
+    
+    def update_metadata(self, vector_id: str, metadata: Dict):
+        with self._lock:
+            if vector_id not in self._rows:
+                return
+            entry = {"op": "update", "id": vector_id, "metadata": metadata}
+            self._log([entry])
+            self._apply(entry)
+    
+    def delete(self, ids: List[str]):
+        with self._lock:
+            entries = [{"op": "delete", "id": vector_id} for vector_id in ids if vector_id in self._rows]
+            if entries:
+                self._log(entries)
+                for entry in entries:
+                    self._apply(entry)
+    
+    def list_ids(self) -> Iterator[str]:
+        with self._lock:
+            ids = list(self._rows)
+        yield from ids
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+    
+    def query(self, vector: List[float], top_k: int, filter: Optional[Dict] = None) -> List[Dict]:
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        
+        # Snapshot under the lock, search outside it so concurrent queries run in parallel.
+        # Rows are append-only and metadata dicts are replaced rather than mutated.
+        with self._lock:
+            matrix = self._get_matrix()
+            row_ids = list(self._row_ids)
+            row_metadata = list(self._row_metadata)
+            if len(self._rows) >= self.ivf_threshold:
+                ivf = self._get_ivf(matrix)
+                live = None
+            else:
+                ivf = None
+                live = np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+        
+        def keep(rows) -> List[int]:
+            return [
+                row for row in rows
+                if row_ids[row] is not None and (not filter or matches_filter(row_metadata[row], filter))
+            ]
+        
+        if ivf is None:
+            candidates = np.asarray(keep(live) if filter else live, dtype=np.int64)
+        else:
+            candidates = np.asarray(self._ivf_candidates(ivf, matrix.shape[0], query, top_k, keep), dtype=np.int64)
+        if candidates.size == 0:
+            return []
+        
+        candidates = np.sort(candidates)
+        scores = matrix[candidates].astype(np.float32) @ query
+        k = min(top_k, candidates.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        
+        return [
+            {
+                "id": row_ids[candidates[i]],
+                "score": float(scores[i]),
+                "metadata": dict(row_metadata[candidates[i]])
+            }
+            for i in top
+        ]
+    
+    def _get_ivf(self, matrix: np.ndarray) -> Dict:
+        if self._ivf is None or len(self._rows) > self._ivf["built_rows"] * 1.2:
+            self._build_ivf(matrix)
+        return self._ivf
+    
+    def _ivf_candidates(self, ivf: Dict, total_rows: int, query: np.ndarray, top_k: int, keep) -> List[int]:
+        # Filters are applied while probing: if the nprobe nearest lists hold fewer than
+        # top_k matching rows, the probe widens (doubling) until they do or every list is probed
+        order = np.argsort(-(ivf["centroids"] @ query))
+        
+        # Rows appended since the index was built are searched exhaustively
+        candidates = keep(range(ivf["built_to_row"], total_rows))
+        probed = 0
+        nprobe = self.nprobe
+        while probed < len(order):
+            for c in order[probed:nprobe]:
+                candidates.extend(keep(ivf["lists"][c]))
+            probed = min(nprobe, len(order))
+            if len(candidates) >= top_k:
+                break
+            nprobe *= 2
+        return candidates
+    
+    def _build_ivf(self, matrix: np.ndarray, iterations: int = 10):
+        rows = np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+        rows.sort()
+        data = np.asarray(matrix[rows], dtype=np.float32)
+        n_lists = max(1, int(np.sqrt(len(rows))))
+        
+        rng = np.random.default_rng(0)
+        sample = data[rng.choice(len(data), size=min(len(data), n_lists * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+        
+        # Spherical k-means on a sample, then assign every live row
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[assignment == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+        
+        assignment = np.empty(len(rows), dtype=np.int64)
+        for start in range(0, len(rows), 8192):
+            assignment[start:start + 8192] = np.argmax(data[start:start + 8192] @ centroids.T, axis=1)
+        
+        self._ivf = {
+            "centroids": centroids,
+            "lists": [rows[assignment == c] for c in range(n_lists)],
+            "built_rows": len(rows),
+            "built_to_row": matrix.shape[0]
+        }
+        logger.info(f"Built IVF index over {len(rows)} vectors ({n_lists} lists)")
+
+
+def create_backend(dimension: int = 1536) -> VectorBackend:
+    backend = os.getenv("MEMORY_BACKEND", "pinecone").lower()
+    if backend == "local":
+        return LocalVectorBackend(
+            directory=os.getenv("LOCAL_MEMORY_DIR", "cache/memory"),
+            dimension=dimension,
+            dtype=os.getenv("LOCAL_MEMORY_DTYPE", "float32"),
+            ivf_threshold=int(os.getenv("LOCAL_MEMORY_IVF_THRESHOLD", "20000"))
+        )
+    if backend != "pinecone":
+        raise ValueError(f"Unknown MEMORY_BACKEND: {backend}")
+    return PineconeBackend(dimension=dimension)
@@ -0,0 +1,86 @@
+import argparse
+from typing import Dict, List, Optional
+import numpy as np
+from loguru import logger
+from memory.vector_store import VectorMemoryStore
+
+
+def cluster_lessons(vectors: Dict[str, List[float]], order: List[str], threshold: float) -> List[List[str]]:
+    # Greedy leader clustering: each lesson joins the first cluster whose leader
+    # it matches at >= threshold cosine similarity, otherwise it starts a new one
+    ids = [lesson_id for lesson_id in order if lesson_id in vectors]
+    if not ids:
+        return []
+    
+    matrix = np.asarray([vectors[lesson_id] for lesson_id in ids], dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = matrix / np.where(norms == 0, 1.0, norms)
+    
+    leaders: List[int] = []
+    clusters: List[List[str]] = []
+    for position, lesson_id in enumerate(ids):
+        if leaders:
+            similarities = matrix[leaders] @ matrix[position]
+            best = int(np.argmax(similarities))
+            if similarities[best] >= threshold:
+                clusters[best].append(lesson_id)
+                continue
+        leaders.append(position)
+        clusters.append([lesson_id])
+    return clusters
+
+
+def consolidate_lessons(
+    store: Optional[VectorMemoryStore] = None,
+    threshold: Optional[float] = None,
+    dry_run: bool = False
+) -> Dict:
+    # Offline compaction: within each url/platform/friction_type group, merge
+    # near-duplicate lessons into the oldest one and delete the rest
+    store = store or VectorMemoryStore()
+    threshold = threshold if threshold is not None else store.dedupe_threshold
+    
+    store.ensure_indexes()
+    report = {"groups": 0, "clusters_merged": 0, "lessons_removed": 0}
+    for group in store.lesson_index.groups():
+        report["groups"] += 1
+        metadata = store.backend.fetch(group)
+        vectors = store.backend.fetch_vectors(group)
+        
+        # Group ids come oldest first, so each cluster's leader is its earliest lesson
+        for cluster in cluster_lessons(vectors, group, threshold):
+            if len(cluster) < 2:
+                continue
+            
+            keeper, duplicates = cluster[0], cluster[1:]
+            members = [metadata.get(lesson_id, {}) for lesson_id in cluster]
+            latest = max(members, key=lambda m: m.get("last_seen") or m.get("timestamp") or "")
+            update = {
+                "occurrences": sum(int(m.get("occurrences", 1)) for m in members),
+                "last_seen": latest.get("last_seen") or latest.get("timestamp"),
+                "resolution": latest.get("resolution", "")
+            }
+            
+            report["clusters_merged"] += 1
+            report["lessons_removed"] += len(duplicates)
+            if dry_run:
+                continue
+            
+            store.backend.update_metadata(keeper, update)
+            store.delete_lessons(duplicates)
+            store.lexical_index.add(keeper, {**metadata.get(keeper, {}), **update})
+    
+    logger.info(
+        f"Consolidated {report['groups']} lesson groups: {report['clusters_merged']} clusters merged, "
+        f"{report['lessons_removed']} lessons {'would be ' if dry_run else ''}removed"
+    )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge near-duplicate lessons in the memory store")
+    parser.add_argument("--threshold", type=float, default=None, help="Cosine similarity to merge at")
+    parser.add_argument("--dry-run", action="store_true", help="Report without modifying the store")
+    args = parser.parse_args()
+    
+    print(consolidate_lessons(threshold=args.threshold, dry_run=args.dry_run))
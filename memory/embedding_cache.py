@@ -0,0 +1,69 @@
+import os
+import sqlite3
+import hashlib
+import threading
+from array import array
+from typing import Dict, List, Optional
+from loguru import logger
+from utils.lru_cache import LRUCache
+
+
+class EmbeddingCache:
+    
+    # In-process LRU of embeddings keyed by (model, text hash), optionally backed by
+    # a SQLite file so vectors survive restarts. Vectors are stored as float32 on disk.
+    
+    def __init__(self, model: str, max_size: int = 2048, disk_path: Optional[str] = None):
+        self.model = model
+        self.memory = LRUCache(max_size=max_size)
+        self.disk_path = disk_path
+        self.disk_hits = 0
+        self._conn = None
+        self._lock = threading.Lock()
+        
+        if disk_path:
+            os.makedirs(os.path.dirname(disk_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(disk_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, model TEXT, vector BLOB)"
+            )
+            self._conn.commit()
+            logger.info(f"Embedding disk cache enabled: {disk_path}")
+    
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\x00{text}".encode()).hexdigest()
+    
+    def get(self, text: str) -> Optional[List[float]]:
+        key = self._key(text)
+        vector = self.memory.get(key)
+        if vector is not None or self._conn is None:
+            return vector
+        
+        with self._lock:
+            row = self._conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        
+        vector = array('f', row[0]).tolist()
+        self.memory.set(key, vector)
+        self.disk_hits += 1
+        return vector
+    
+    def set(self, text: str, vector: List[float]):
+        key = self._key(text)
+        vector = list(vector)
+        self.memory.set(key, vector)
+        
+        if self._conn is not None:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, model, vector) VALUES (?, ?, ?)",
+                    (key, self.model, array('f', vector).tobytes())
+                )
+                self._conn.commit()
+    
+    def get_stats(self) -> Dict:
+        stats = self.memory.get_stats()
+        stats["disk_hits"] = self.disk_hits
+        stats["disk_enabled"] = self._conn is not None
+        return stats
@@ -0,0 +1,152 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from loguru import logger
+from utils.helpers import normalize_url, extract_domain
+
+
+class LessonIndex:
+    
+    # Secondary SQLite index of lesson metadata (url, domain, platform, friction_type),
+    # so exact lookups never touch the vector index or the embeddings API.
+    # Removed lessons leave a tombstone so snapshot deltas can carry deletions.
+    
+    FILTER_COLUMNS = ("url", "domain", "platform", "friction_type")
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("LESSON_INDEX_PATH", "cache/lesson_index.sqlite")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS lessons (
+                lesson_id TEXT PRIMARY KEY,
+                url TEXT,
+                domain TEXT,
+                platform TEXT,
+                friction_type TEXT,
+                timestamp TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_lessons_url ON lessons (url, platform);
+            CREATE INDEX IF NOT EXISTS idx_lessons_domain ON lessons (domain, platform);
+            CREATE INDEX IF NOT EXISTS idx_lessons_friction ON lessons (friction_type, platform);
+            CREATE TABLE IF NOT EXISTS deleted_lessons (
+                lesson_id TEXT PRIMARY KEY,
+                deleted_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_deleted_at ON deleted_lessons (deleted_at);
+        """)
+        self._conn.commit()
+    
+    @staticmethod
+    def _row(lesson_id: str, metadata: Dict) -> Tuple:
+        url = metadata.get("url") or ""
+        normalized = normalize_url(url) if url else ""
+        return (
+            lesson_id,
+            normalized,
+            extract_domain(normalized) if normalized else "",
+            metadata.get("platform"),
+            metadata.get("friction_type"),
+            metadata.get("timestamp")
+        )
+    
+    def add(self, lesson_id: str, metadata: Dict):
+        self.add_many([(lesson_id, metadata)])
+    
+    def add_many(self, lessons: Iterable[Tuple[str, Dict]]):
+        rows = [self._row(lesson_id, metadata) for lesson_id, metadata in lessons]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO lessons VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.executemany(
+                "DELETE FROM deleted_lessons WHERE lesson_id = ?", [(row[0],) for row in rows]
+            )
+            self._conn.commit()
+    
+    def remove(self, lesson_ids: List[str]):
+        if not lesson_ids:
+            return
+        deleted_at = datetime.utcnow().isoformat()
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM lessons WHERE lesson_id = ?", [(lesson_id,) for lesson_id in lesson_ids]
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO deleted_lessons VALUES (?, ?)",
+                [(lesson_id, deleted_at) for lesson_id in lesson_ids]
+            )
+            self._conn.commit()
+    
+    def deleted_since(self, since: Optional[str] = None) -> List[str]:
+        # Tombstones of lessons removed at or after `since` (ISO timestamp), oldest first
+        sql = "SELECT lesson_id FROM deleted_lessons"
+        params: list = []
+        if since:
+            sql += " WHERE deleted_at >= ?"
+            params.append(since)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql + " ORDER BY deleted_at, lesson_id", params)]
+    
+    def _where(self, filters: Dict) -> Tuple[str, list]:
+        clauses = []
+        params = []
+        for column in self.FILTER_COLUMNS:
+            value = filters.get(column)
+            if value is None:
+                continue
+            if column == "url":
+                value = normalize_url(value)
+            elif column == "domain":
+                value = value.lower()
+            clauses.append(f"{column} = ?")
+            params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+    
+    def lookup(self, limit: Optional[int] = None, offset: int = 0, **filters) -> List[str]:
+        # filters: any of url, domain, platform, friction_type; newest lessons first
+        where, params = self._where(filters)
+        sql = f"SELECT lesson_id FROM lessons{where} ORDER BY timestamp DESC, lesson_id"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        elif offset:
+            sql += " LIMIT -1 OFFSET ?"
+            params.append(offset)
+        
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params)]
+    
+    def ids(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT lesson_id FROM lessons")]
+    
+    def count(self, **filters) -> int:
+        where, params = self._where(filters)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM lessons{where}", params).fetchone()[0]
+    
+    def groups(self, min_size: int = 2) -> List[List[str]]:
+        # Lesson ids sharing url, platform and friction_type (candidates for consolidation)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, platform, friction_type, lesson_id FROM lessons "
+                "ORDER BY url, platform, friction_type, timestamp"
+            ).fetchall()
+        
+        grouped: Dict[Tuple, List[str]] = {}
+        for url, platform, friction_type, lesson_id in rows:
+            grouped.setdefault((url, platform, friction_type), []).append(lesson_id)
+        return [ids for ids in grouped.values() if len(ids) >= min_size]
+    
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM lessons")
+            self._conn.commit()
+        logger.info("Lesson index cleared")
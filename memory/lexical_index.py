@@ -0,0 +1,109 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from loguru import logger
+
+
+TOKEN_PATTERN = re.compile(r"[\w#-]+")
+URL_PATTERN = re.compile(r"https?://\S+")
+
+
+class LexicalIndex:
+    
+    # BM25 full-text index over lesson text, resolution and error text, backed by
+    # SQLite FTS5. Complements vector search for exact selector/error-message matches.
+    
+    def __init__(self, path: Optional[str] = None, max_query_terms: int = 32):
+        self.path = path or os.getenv("LEXICAL_INDEX_PATH", "cache/lexical_index.sqlite")
+        self.max_query_terms = max_query_terms
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS lessons_fts USING fts5("
+            "lesson_id UNINDEXED, platform UNINDEXED, body, "
+            "tokenize = \"unicode61 tokenchars '-_#'\")"
+        )
+        self._conn.commit()
+    
+    @staticmethod
+    def _document(metadata: Dict) -> str:
+        return "\n".join(
+            str(metadata[field]) for field in ("lesson_text", "resolution", "error_message")
+            if metadata.get(field)
+        )
+    
+    def add_many(self, lessons: Iterable[Tuple[str, Dict]]):
+        rows = [(lesson_id, metadata.get("platform"), self._document(metadata)) for lesson_id, metadata in lessons]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM lessons_fts WHERE lesson_id = ?", [(row[0],) for row in rows]
+            )
+            self._conn.executemany("INSERT INTO lessons_fts VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+    
+    def add(self, lesson_id: str, metadata: Dict):
+        self.add_many([(lesson_id, metadata)])
+    
+    def remove(self, lesson_ids: List[str]):
+        if not lesson_ids:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM lessons_fts WHERE lesson_id = ?", [(lesson_id,) for lesson_id in lesson_ids]
+            )
+            self._conn.commit()
+    
+    def ids(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT lesson_id FROM lessons_fts")]
+    
+    def _match_expression(self, query: str) -> Optional[str]:
+        # URLs are matched through metadata filters, not text; drop them from the query
+        terms = []
+        for token in TOKEN_PATTERN.findall(URL_PATTERN.sub(" ", query).lower()):
+            if len(token) > 1 and token not in terms:
+                terms.append(token)
+        if not terms:
+            return None
+        return " OR ".join('"' + term.replace('"', '""') + '"' for term in terms[:self.max_query_terms])
+    
+    def search(self, query: str, platform: Optional[str] = None, limit: int = 50) -> List[Tuple[str, float]]:
+        # Returns (lesson_id, bm25 score) best first; higher scores are better
+        expression = self._match_expression(query)
+        if expression is None:
+            return []
+        
+        sql = "SELECT lesson_id, bm25(lessons_fts) AS rank FROM lessons_fts WHERE lessons_fts MATCH ?"
+        params: list = [expression]
+        if platform:
+            sql += " AND platform = ?"
+            params.append(platform)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Lexical search failed for '{query[:80]}': {str(e)}")
+            return []
+        return [(lesson_id, -rank) for lesson_id, rank in rows]
+    
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM lessons_fts")
+            self._conn.commit()
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> Dict[str, float]:
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank + 1)
+    return scores
@@ -0,0 +1,129 @@
+import os
+import json
+import hashlib
+import tempfile
+from typing import Dict, Optional
+from datetime import datetime
+from loguru import logger
+from config.state_schema import FrictionPoint
+from utils.helpers import normalize_url
+
+
+class PageAuditCache:
+    
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or os.getenv("PAGE_AUDIT_CACHE_DIR", "cache/page_audits")
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def _path(self, url: str) -> str:
+        key = hashlib.sha256(normalize_url(url).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def _load(self, url: str) -> Optional[Dict]:
+        path = self._path(url)
+        if not os.path.exists(path):
+            return None
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable page audit cache {path}: {str(e)}")
+            return None
+    
+    def _save(self, url: str, entry: Dict):
+        path = self._path(url)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, default=str)
+        os.replace(tmp_path, path)
+    
+    def _entry_for(self, url: str, fingerprint: str) -> Dict:
+        entry = self._load(url)
+        
+        # A changed page invalidates everything recorded for the previous version
+        if not entry or entry.get("fingerprint") != fingerprint:
+            entry = {
+                "url": normalize_url(url),
+                "fingerprint": fingerprint,
+                "semantic_schema": None,
+                "audits": {}
+            }
+        
+        entry["updated_at"] = datetime.utcnow().isoformat()
+        return entry
+    
+    def get_previous_fingerprint(self, url: str) -> Optional[str]:
+        entry = self._load(url)
+        return entry.get("fingerprint") if entry else None
+    
+    def get_schema(self, url: str, fingerprint: Optional[str]) -> Optional[Dict]:
+        if not fingerprint:
+            return None
+        
+        entry = self._load(url)
+        if not entry or entry.get("fingerprint") != fingerprint:
+            return None
+        
+        return entry.get("semantic_schema")
+    
+    def store_schema(self, url: str, fingerprint: Optional[str], schema: Dict):
+        if not fingerprint or not schema.get("success"):
+            return
+        
+        entry = self._entry_for(url, fingerprint)
+        entry["semantic_schema"] = schema
+        self._save(url, entry)
+    
+    @staticmethod
+    def _audit_key(persona: str, platform: str, prompt_inputs: Optional[Dict]) -> str:
+        # Audits depend on everything that went into the prompt, not only the page
+        digest = hashlib.sha256(
+            json.dumps(prompt_inputs or {}, sort_keys=True, default=str).encode()
+        ).hexdigest()[:16]
+        return f"{persona}:{platform}:{digest}"
+    
+    def get_audit(
+        self,
+        url: str,
+        fingerprint: Optional[str],
+        persona: str,
+        platform: str,
+        prompt_inputs: Optional[Dict] = None
+    ) -> Optional[Dict]:
+        if not fingerprint:
+            return None
+        
+        entry = self._load(url)
+        if not entry or entry.get("fingerprint") != fingerprint:
+            return None
+        
+        audit = entry["audits"].get(self._audit_key(persona, platform, prompt_inputs))
+        if not audit:
+            return None
+        
+        return {
+            **audit,
+            "friction_points": [FrictionPoint(**fp) for fp in audit["friction_points"]]
+        }
+    
+    def store_audit(
+        self,
+        url: str,
+        fingerprint: Optional[str],
+        persona: str,
+        platform: str,
+        audit_results: Dict,
+        prompt_inputs: Optional[Dict] = None
+    ):
+        if not fingerprint:
+            return
+        
+        entry = self._entry_for(url, fingerprint)
+        entry["audits"][self._audit_key(persona, platform, prompt_inputs)] = {
+            **audit_results,
+            "friction_points": [fp.dict() for fp in audit_results["friction_points"]]
+        }
+        self._save(url, entry)
+        logger.debug(f"Cached audit for {url} ({persona}/{platform})")
@@ -0,0 +1,195 @@
+import os
+import gzip
+import json
+import shutil
+import hashlib
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+from loguru import logger
+
+
+SNAPSHOT_FORMAT = "performile-memory-snapshot"
+SNAPSHOT_VERSION = 2
+VECTORS_FILE = "vectors.f16.npy"
+METADATA_FILE = "metadata.json.gz"
+MANIFEST_FILE = "manifest.json"
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _iter_lessons(store, since: Optional[str], batch_size: int):
+    batch = []
+    for lesson_id in store.backend.list_ids():
+        batch.append(lesson_id)
+        if len(batch) >= batch_size:
+            yield from _fetch_batch(store, batch, since)
+            batch = []
+    if batch:
+        yield from _fetch_batch(store, batch, since)
+
+
+def _fetch_batch(store, lesson_ids: List[str], since: Optional[str]):
+    metadata = store.backend.fetch(lesson_ids)
+    vectors = store.backend.fetch_vectors(lesson_ids)
+    for lesson_id in lesson_ids:
+        if lesson_id not in metadata or lesson_id not in vectors:
+            continue
+        changed_at = metadata[lesson_id].get("last_seen") or metadata[lesson_id].get("timestamp") or ""
+        if since and changed_at < since:
+            continue
+        yield lesson_id, vectors[lesson_id], metadata[lesson_id]
+
+
+def _write_vectors(store, since: Optional[str], batch_size: int, staging: str, dimension: int):
+    # Vectors are spooled to a raw float16 file a batch at a time, then copied into
+    # the .npy once the row count is known, so memory stays bounded by batch_size
+    raw_path = os.path.join(staging, VECTORS_FILE + ".raw")
+    ids = []
+    rows = []
+    chunk = []
+    with open(raw_path, "wb") as raw:
+        for lesson_id, vector, metadata in _iter_lessons(store, since, batch_size):
+            ids.append(lesson_id)
+            rows.append(metadata)
+            chunk.append(vector)
+            if len(chunk) >= batch_size:
+                raw.write(np.asarray(chunk, dtype=np.float16).tobytes())
+                chunk = []
+        if chunk:
+            raw.write(np.asarray(chunk, dtype=np.float16).tobytes())
+    
+    matrix = np.lib.format.open_memmap(
+        os.path.join(staging, VECTORS_FILE), mode="w+", dtype=np.float16, shape=(len(ids), dimension)
+    )
+    if ids:
+        spooled = np.memmap(raw_path, dtype=np.float16, mode="r", shape=(len(ids), dimension))
+        for start in range(0, len(ids), batch_size):
+            matrix[start:start + batch_size] = spooled[start:start + batch_size]
+        del spooled
+    matrix.flush()
+    del matrix
+    os.unlink(raw_path)
+    return ids, rows
+
+
+def export_snapshot(store, path: str, since: Optional[str] = None, batch_size: int = 500) -> Dict:
+    # Snapshot layout (a directory):
+    #   vectors.f16.npy   float16 (n, dim) matrix, memory-mappable with np.load(mmap_mode="r")
+    #   metadata.json.gz  columnar metadata: {"ids": [...], "columns": {field: [...]}, "deleted": [...]}
+    #   manifest.json     format version, model, dimension, count, delta base and file checksums
+    # With `since` (ISO timestamp) only lessons created or merged after it are exported,
+    # along with tombstones for lessons deleted since; pass the previous snapshot's
+    # created_at to build a delta.
+    created_at = datetime.utcnow().isoformat()
+    dimension = store.embedding_dimension
+    
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=parent, prefix=".snapshot-")
+    try:
+        ids, rows = _write_vectors(store, since, batch_size, staging, dimension)
+        deleted = store.lesson_index.deleted_since(since) if since else []
+        fields = sorted({field for row in rows for field in row})
+        columns = {field: [row.get(field) for row in rows] for field in fields}
+        
+        with gzip.open(os.path.join(staging, METADATA_FILE), "wt", encoding="utf-8") as f:
+            json.dump({"ids": ids, "columns": columns, "deleted": deleted}, f, default=str, separators=(",", ":"))
+        
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "version": SNAPSHOT_VERSION,
+            "created_at": created_at,
+            "embedding_model": store.embedding_model,
+            "dimension": dimension,
+            "count": len(ids),
+            "deleted": len(deleted),
+            "since": since,
+            "files": {
+                name: _sha256(os.path.join(staging, name))
+                for name in (VECTORS_FILE, METADATA_FILE)
+            }
+        }
+        with open(os.path.join(staging, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        
+        # Publish the finished snapshot in one step
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.replace(staging, path)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    
+    logger.info(
+        f"Exported {len(ids)} lessons to snapshot {path}"
+        + (f" (delta since {since}, {len(deleted)} deletions)" if since else "")
+    )
+    return manifest
+
+
+def read_manifest(path: str, verify: bool = True) -> Dict:
+    with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"{path} is not a memory snapshot")
+    if manifest.get("version", 0) > SNAPSHOT_VERSION:
+        raise ValueError(f"Snapshot version {manifest['version']} is newer than supported ({SNAPSHOT_VERSION})")
+    
+    if verify:
+        for name, checksum in manifest["files"].items():
+            if _sha256(os.path.join(path, name)) != checksum:
+                raise ValueError(f"Checksum mismatch for {name} in snapshot {path}")
+    return manifest
+
+
+def import_snapshot(store, path: str, verify: bool = True, batch_size: int = 500) -> Dict:
+    # Upserts every lesson in the snapshot (lessons with the same id are replaced), then
+    # deletes the delta's tombstoned lessons; apply deltas in order after the full snapshot
+    manifest = read_manifest(path, verify=verify)
+    
+    if manifest["embedding_model"] != store.embedding_model or manifest["dimension"] != store.embedding_dimension:
+        raise ValueError(
+            f"Snapshot embeddings ({manifest['embedding_model']}, {manifest['dimension']}d) do not match "
+            f"this store ({store.embedding_model}, {store.embedding_dimension}d)"
+        )
+    
+    matrix = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r")
+    with gzip.open(os.path.join(path, METADATA_FILE), "rt", encoding="utf-8") as f:
+        packed = json.load(f)
+    
+    ids = packed["ids"]
+    columns = packed["columns"]
+    for start in range(0, len(ids), batch_size):
+        end = min(start + batch_size, len(ids))
+        lessons = []
+        for position in range(start, end):
+            # Fields a lesson never had are stored as nulls in the columnar layout
+            metadata = {
+                field: values[position] for field, values in columns.items()
+                if values[position] is not None
+            }
+            lessons.append((ids[position], metadata))
+        
+        vectors = np.asarray(matrix[start:end], dtype=np.float32).tolist()
+        store.backend.upsert([
+            (lesson_id, vector, metadata)
+            for (lesson_id, metadata), vector in zip(lessons, vectors)
+        ])
+        store._index_lessons(lessons)
+    
+    # Version 1 snapshots carry no tombstones
+    deleted = packed.get("deleted", [])
+    for start in range(0, len(deleted), batch_size):
+        store.delete_lessons(deleted[start:start + batch_size])
+    
+    logger.info(f"Imported {len(ids)} lessons and {len(deleted)} deletions from snapshot {path}")
+    return manifest
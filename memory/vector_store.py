@@ -1,49 +1,116 @@
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
-from pinecone import Pinecone, ServerlessSpec
 from datetime import datetime
 import hashlib
 import json
+import numpy as np
 from loguru import logger
+from memory.backends import VectorBackend, create_backend
+from memory.embedding_cache import EmbeddingCache
+from memory.lesson_index import LessonIndex
+from memory.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from memory import snapshot
+from utils.embedding_service import DEFAULT_MODEL, get_embedding_service
+from utils.helpers import normalize_url, extract_domain
 
 
 class VectorMemoryStore:
     
-    def __init__(self):
-        self.api_key = os.getenv("PINECONE_API_KEY")
-        self.environment = os.getenv("PINECONE_ENVIRONMENT", "gcp-starter")
-        self.index_name = os.getenv("PINECONE_INDEX_NAME", "performile-memory")
-        
-        self.pc = Pinecone(api_key=self.api_key)
-        self._initialize_index()
-    
-    def _initialize_index(self):
-        existing_indexes = [index.name for index in self.pc.list_indexes()]
-        
-        if self.index_name not in existing_indexes:
-            logger.info(f"Creating new Pinecone index: {self.index_name}")
-            self.pc.create_index(
-                name=self.index_name,
-                dimension=1536,
-                metric="cosine",
-                spec=ServerlessSpec(
-                    cloud="aws",
-                    region="us-east-1"
-                )
-            )
+    def __init__(self, backend: Optional[VectorBackend] = None):
+        # EMBEDDING_PROVIDER=local embeds with the shared sentence-transformers model
+        # instead of OpenAI. Its vectors have a different dimension, so point
+        # PINECONE_INDEX_NAME / LOCAL_MEMORY_DIR at a separate index when switching.
+        self.embedding_provider = os.getenv("EMBEDDING_PROVIDER", "openai").lower()
+        if self.embedding_provider == "local":
+            self.embedding_service = get_embedding_service(os.getenv("LOCAL_EMBEDDING_MODEL", DEFAULT_MODEL))
+            self.embedding_model = self.embedding_service.model_name
+        else:
+            self.embedding_service = None
+            self.embedding_model = "text-embedding-3-small"
+        
+        self.embedding_cache = EmbeddingCache(
+            self.embedding_model,
+            max_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "2048")),
+            disk_path=os.getenv("EMBEDDING_CACHE_PATH") or None
+        )
+        self._openai_client = None
+        
+        # MEMORY_BACKEND=local keeps lessons in an on-disk index instead of Pinecone
+        self.backend = backend if backend is not None else create_backend(dimension=self.embedding_dimension)
+        self.lesson_index = LessonIndex()
+        self.lexical_index = LexicalIndex()
+        
+        # The SQLite indexes are local to this host; lessons stored before they existed
+        # or by other workers are backfilled from the backend on first lookup. A failed
+        # sync (e.g. a backend that cannot list ids) is retried after a backoff.
+        self._indexes_synced = False
+        self._index_sync_lock = threading.Lock()
+        self._index_sync_retry_at = 0.0
+        self.index_sync_backoff = float(os.getenv("LESSON_INDEX_SYNC_BACKOFF", "300"))
+        
+        # Fuse BM25 matches with vector similarity when retrieving lessons
+        self.hybrid_retrieval = os.getenv("HYBRID_RETRIEVAL", "true").lower() == "true"
+        self.hybrid_candidates = int(os.getenv("HYBRID_CANDIDATES", "50"))
+        # When BM25 alone finds top_k candidates, only those are scored densely
+        self.hybrid_prefilter = os.getenv("HYBRID_PREFILTER", "true").lower() == "true"
         
-        self.index = self.pc.Index(self.index_name)
-        logger.info(f"Connected to Pinecone index: {self.index_name}")
+        # Lessons this similar to an existing one for the same url/platform/friction type
+        # are merged into it (occurrence counter) instead of stored as a new vector
+        self.dedupe_threshold = float(os.getenv("LESSON_DEDUPE_THRESHOLD", "0.92"))
     
-    def generate_embedding(self, text: str) -> List[float]:
-        from openai import OpenAI
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    @property
+    def openai_client(self):
+        # One client (and HTTP connection pool) per store, created on first use
+        if self._openai_client is None:
+            from openai import OpenAI
+            self._openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return self._openai_client
+    
+    @property
+    def embedding_dimension(self) -> int:
+        return self.embedding_service.dimension if self.embedding_service else 1536
+    
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        if self.embedding_service:
+            return self.embedding_service.embed(texts).tolist()
         
-        response = client.embeddings.create(
-            model="text-embedding-3-small",
-            input=text
+        response = self.openai_client.embeddings.create(
+            model=self.embedding_model,
+            input=texts
         )
-        return response.data[0].embedding
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+    
+    def generate_embedding(self, text: str) -> List[float]:
+        cached = self.embedding_cache.get(text)
+        if cached is not None:
+            return cached
+        
+        embedding = self._embed([text])[0]
+        self.embedding_cache.set(text, embedding)
+        return embedding
+    
+    def generate_embeddings(self, texts: List[str], batch_size: int = 100) -> List[List[float]]:
+        embeddings: List[Optional[List[float]]] = [self.embedding_cache.get(text) for text in texts]
+        missing = sorted({text for text, embedding in zip(texts, embeddings) if embedding is None})
+        
+        # One embeddings request per batch of distinct uncached texts
+        fetched = {}
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            for text, embedding in zip(batch, self._embed(batch)):
+                fetched[text] = embedding
+                self.embedding_cache.set(text, embedding)
+        
+        return [
+            embedding if embedding is not None else fetched[text]
+            for text, embedding in zip(texts, embeddings)
+        ]
+    
+    def get_embedding_cache_stats(self) -> Dict:
+        return self.embedding_cache.get_stats()
     
     def store_lesson(
         self,
@@ -54,37 +121,169 @@ class VectorMemoryStore:
         resolution: str,
         metadata: Optional[Dict] = None
     ) -> str:
+        lesson_id, vector_metadata = self._build_lesson_record(
+            lesson_text, url, platform, friction_type, resolution, metadata
+        )
+        embedding = self.generate_embedding(lesson_text)
+        
+        duplicate = self._find_duplicate(embedding, vector_metadata)
+        if duplicate:
+            return self._merge_into(duplicate, vector_metadata)
+        
+        self.backend.upsert([(lesson_id, embedding, vector_metadata)])
+        self._index_lessons([(lesson_id, vector_metadata)])
+        
+        logger.info(f"Stored lesson in memory: {lesson_id}")
+        return lesson_id
+    
+    def _find_duplicate(self, embedding: List[float], vector_metadata: Dict) -> Optional[Dict]:
+        if self.dedupe_threshold >= 1.0:
+            return None
+        
+        matches = self.backend.query(
+            embedding,
+            top_k=1,
+            filter={
+                "url": normalize_url(vector_metadata["url"]),
+                "platform": vector_metadata["platform"],
+                "friction_type": vector_metadata["friction_type"]
+            }
+        )
+        if matches and matches[0]["score"] >= self.dedupe_threshold:
+            return matches[0]
+        return None
+    
+    def _merge_into(self, existing: Dict, vector_metadata: Dict) -> str:
+        existing_metadata = existing.get("metadata") or {}
+        update = {
+            "occurrences": int(existing_metadata.get("occurrences", 1)) + int(vector_metadata.get("occurrences", 1)),
+            "last_seen": vector_metadata["timestamp"],
+            "resolution": vector_metadata["resolution"]
+        }
+        self.backend.update_metadata(existing["id"], update)
+        self.lexical_index.add(existing["id"], {**existing_metadata, **update})
+        
+        logger.info(
+            f"Merged lesson into {existing['id']} (similarity {existing['score']:.3f}, "
+            f"{update['occurrences']} occurrences)"
+        )
+        return existing["id"]
+    
+    def _build_lesson_record(
+        self,
+        lesson_text: str,
+        url: str,
+        platform: str,
+        friction_type: str,
+        resolution: str,
+        metadata: Optional[Dict] = None
+    ) -> tuple:
+        timestamp = datetime.utcnow().isoformat()
         lesson_id = hashlib.md5(
-            f"{url}_{platform}_{friction_type}_{datetime.utcnow().isoformat()}".encode()
+            f"{url}_{platform}_{friction_type}_{timestamp}_{lesson_text}".encode()
         ).hexdigest()
         
-        embedding = self.generate_embedding(lesson_text)
-        
         vector_metadata = {
             "lesson_id": lesson_id,
             "url": url,
             "platform": platform,
             "friction_type": friction_type,
             "resolution": resolution,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": timestamp,
+            "last_seen": timestamp,
+            "occurrences": 1,
             "lesson_text": lesson_text[:1000]
         }
         
         if metadata:
             vector_metadata.update(metadata)
         
-        self.index.upsert(
-            vectors=[(lesson_id, embedding, vector_metadata)]
-        )
+        # Stored normalized so duplicate checks and url filters match tracking-param variants
+        vector_metadata["url"] = normalize_url(vector_metadata["url"])
+        return lesson_id, vector_metadata
+    
+    def store_lessons_bulk(
+        self,
+        lessons: List[Dict],
+        embed_batch_size: int = 100,
+        upsert_batch_size: int = 100,
+        dedupe: bool = True
+    ) -> Dict:
+        # lessons: [{"lesson_text", "url", "platform", "friction_type", "resolution", "metadata"?}]
+        records = []
+        failed = []
+        for position, lesson in enumerate(lessons):
+            try:
+                lesson_id, vector_metadata = self._build_lesson_record(
+                    lesson["lesson_text"],
+                    lesson["url"],
+                    lesson["platform"],
+                    lesson["friction_type"],
+                    lesson.get("resolution", ""),
+                    lesson.get("metadata")
+                )
+                records.append((position, lesson_id, lesson["lesson_text"], vector_metadata))
+            except KeyError as e:
+                failed.append({"index": position, "error": f"missing field {e}"})
         
-        logger.info(f"Stored lesson in memory: {lesson_id}")
-        return lesson_id
+        stored_ids = []
+        merged_ids = []
+        for start in range(0, len(records), upsert_batch_size):
+            chunk = records[start:start + upsert_batch_size]
+            try:
+                embeddings = self.generate_embeddings([text for _, _, text, _ in chunk], embed_batch_size)
+                
+                # Duplicate checks run concurrently; duplicates within one chunk are
+                # left for the offline consolidation job
+                duplicates = [None] * len(chunk)
+                if dedupe:
+                    with ThreadPoolExecutor(max_workers=8) as executor:
+                        duplicates = list(executor.map(
+                            self._find_duplicate, embeddings, [record[3] for record in chunk]
+                        ))
+                
+                new_records = []
+                for record, embedding, duplicate in zip(chunk, embeddings, duplicates):
+                    if duplicate:
+                        merged_ids.append(self._merge_into(duplicate, record[3]))
+                    else:
+                        new_records.append((record, embedding))
+                
+                if new_records:
+                    self.backend.upsert([
+                        (lesson_id, embedding, vector_metadata)
+                        for (_, lesson_id, _, vector_metadata), embedding in new_records
+                    ])
+                    self._index_lessons([
+                        (lesson_id, vector_metadata) for (_, lesson_id, _, vector_metadata), _ in new_records
+                    ])
+                    stored_ids.extend(lesson_id for (_, lesson_id, _, _), _ in new_records)
+            except Exception as e:
+                logger.error(f"Bulk lesson upsert failed for {len(chunk)} lessons: {str(e)}")
+                failed.extend({"index": position, "error": str(e)} for position, _, _, _ in chunk)
+        
+        logger.info(
+            f"Stored {len(stored_ids)} lessons in memory "
+            f"({len(merged_ids)} merged into existing, {len(failed)} failed)"
+        )
+        return {"stored": stored_ids, "merged": merged_ids, "failed": failed}
+    
+    def _index_lessons(self, lessons: List[tuple]):
+        self.lesson_index.add_many(lessons)
+        self.lexical_index.add_many(lessons)
+    
+    def delete_lessons(self, lesson_ids: List[str]):
+        # The lesson index keeps a tombstone per id for snapshot deltas
+        self.backend.delete(lesson_ids)
+        self.lesson_index.remove(lesson_ids)
+        self.lexical_index.remove(lesson_ids)
     
     def retrieve_similar_lessons(
         self,
         query: str,
         platform: Optional[str] = None,
-        top_k: int = 5
+        top_k: int = 5,
+        hybrid: Optional[bool] = None
     ) -> List[Dict]:
         query_embedding = self.generate_embedding(query)
         
@@ -92,24 +291,107 @@ class VectorMemoryStore:
         if platform:
             filter_dict["platform"] = platform
         
-        results = self.index.query(
-            vector=query_embedding,
-            top_k=top_k,
-            include_metadata=True,
-            filter=filter_dict if filter_dict else None
-        )
-        
-        lessons = []
-        for match in results.matches:
-            lessons.append({
-                "id": match.id,
-                "score": match.score,
-                "metadata": match.metadata
-            })
+        if hybrid if hybrid is not None else self.hybrid_retrieval:
+            lessons = self._hybrid_search(query, query_embedding, platform, top_k)
+        else:
+            lessons = self.backend.query(query_embedding, top_k=top_k, filter=filter_dict or None)
         
         logger.info(f"Retrieved {len(lessons)} similar lessons from memory")
         return lessons
     
+    def _hybrid_search(
+        self,
+        query: str,
+        query_embedding: List[float],
+        platform: Optional[str],
+        top_k: int
+    ) -> List[Dict]:
+        self.ensure_indexes()
+        candidate_k = max(self.hybrid_candidates, top_k)
+        filter_dict = {"platform": platform} if platform else None
+        
+        lexical = self.lexical_index.search(query, platform=platform, limit=candidate_k)
+        lexical_ids = [lesson_id for lesson_id, _ in lexical]
+        
+        if self.hybrid_prefilter and len(lexical_ids) >= top_k:
+            # The lexical short list is the candidate set; no search over the whole vector index
+            results = self._score_candidates(query_embedding, lexical_ids)
+            dense_ranking = sorted(results, key=lambda lesson_id: results[lesson_id]["score"], reverse=True)
+        else:
+            dense = self.backend.query(query_embedding, top_k=candidate_k, filter=filter_dict)
+            results = {lesson["id"]: lesson for lesson in dense}
+            # Only lexical hits the dense search missed need a similarity score computed
+            results.update(self._score_candidates(
+                query_embedding, [lesson_id for lesson_id in lexical_ids if lesson_id not in results]
+            ))
+            dense_ranking = [lesson["id"] for lesson in dense]
+        
+        fused = reciprocal_rank_fusion([
+            dense_ranking,
+            [lesson_id for lesson_id in lexical_ids if lesson_id in results]
+        ])
+        ranked = sorted(results.values(), key=lambda lesson: fused[lesson["id"]], reverse=True)[:top_k]
+        for lesson in ranked:
+            lesson["fusion_score"] = fused[lesson["id"]]
+        return ranked
+    
+    def _score_candidates(self, query_embedding: List[float], lesson_ids: List[str]) -> Dict[str, Dict]:
+        # Cosine similarity of the query to each candidate, shaped like backend query results
+        if not lesson_ids:
+            return {}
+        vectors = self.backend.fetch_vectors(lesson_ids)
+        metadata = self.backend.fetch(lesson_ids)
+        found = [lesson_id for lesson_id in lesson_ids if lesson_id in vectors and lesson_id in metadata]
+        if not found:
+            return {}
+        
+        matrix = np.asarray([vectors[lesson_id] for lesson_id in found], dtype=np.float32)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+        scores = (matrix @ query) / np.where(norms == 0, 1.0, norms)
+        return {
+            lesson_id: {"id": lesson_id, "score": float(score), "metadata": metadata[lesson_id]}
+            for lesson_id, score in zip(found, scores)
+        }
+    
+    def retrieve_similar_lessons_many(
+        self,
+        queries: List[str],
+        platform: Optional[str] = None,
+        top_k: int = 5,
+        max_workers: int = 8,
+        hybrid: Optional[bool] = None
+    ) -> List[Dict]:
+        # Embeds all queries in batched requests, then runs the index queries concurrently
+        # through the same dense or hybrid path as retrieve_similar_lessons.
+        # Returns one {"query", "lessons", "error"} entry per query, in input order.
+        try:
+            embeddings = self.generate_embeddings(queries)
+        except Exception as e:
+            logger.error(f"Batch query embedding failed: {str(e)}")
+            return [{"query": query, "lessons": [], "error": str(e)} for query in queries]
+        
+        filter_dict = {"platform": platform} if platform else None
+        use_hybrid = hybrid if hybrid is not None else self.hybrid_retrieval
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries)))) as executor:
+            futures = [
+                executor.submit(self._hybrid_search, query, embedding, platform, top_k) if use_hybrid
+                else executor.submit(self.backend.query, embedding, top_k, filter_dict)
+                for query, embedding in zip(queries, embeddings)
+            ]
+        
+        responses = []
+        for query, future in zip(queries, futures):
+            try:
+                responses.append({"query": query, "lessons": future.result(), "error": None})
+            except Exception as e:
+                logger.error(f"Memory query failed for '{query[:80]}': {str(e)}")
+                responses.append({"query": query, "lessons": [], "error": str(e)})
+        
+        logger.info(f"Ran {len(queries)} memory queries ({sum(1 for r in responses if r['error'])} failed)")
+        return responses
+    
     def check_cross_platform_friction(
         self,
         url: str,
@@ -121,30 +403,154 @@ class VectorMemoryStore:
         query = f"friction on {url} with {element_description}"
         lessons = self.retrieve_similar_lessons(query, platform=other_platform, top_k=3)
         
-        if lessons and lessons[0]["score"] > 0.85:
+        # Hybrid results are ordered by fusion rank, so check the best cosine similarity
+        best = max(lessons, key=lambda lesson: lesson["score"], default=None)
+        if best and best["score"] > 0.85:
             logger.warning(
-                f"Found similar friction on {other_platform}: {lessons[0]['metadata'].get('friction_type')}"
+                f"Found similar friction on {other_platform}: {best['metadata'].get('friction_type')}"
             )
-            return lessons[0]
+            return best
         
         return None
     
-    def get_all_lessons_for_url(self, url: str) -> List[Dict]:
-        dummy_query = f"lessons for {url}"
-        query_embedding = self.generate_embedding(dummy_query)
+    def get_all_lessons_for_url(
+        self,
+        url: str,
+        platform: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict]:
+        return self.find_lessons(url=url, platform=platform, limit=limit, offset=offset)
+    
+    def find_lessons(
+        self,
+        url: Optional[str] = None,
+        domain: Optional[str] = None,
+        platform: Optional[str] = None,
+        friction_type: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict]:
+        self.ensure_indexes()
+        filters = {
+            key: value for key, value in
+            (("url", url), ("domain", domain), ("platform", platform), ("friction_type", friction_type))
+            if value is not None
+        }
+        lesson_ids = self.lesson_index.lookup(limit=limit, offset=offset, **filters)
+        if lesson_ids or self._indexes_synced or self.lesson_index.count(**filters):
+            return self._fetch_lessons(lesson_ids)
         
-        results = self.index.query(
-            vector=query_embedding,
-            top_k=50,
-            include_metadata=True,
-            filter={"url": url}
-        )
+        # Without a successful sync a miss may only mean the local index is incomplete
+        return self._query_lessons(filters, limit, offset)
+    
+    def _query_lessons(self, filters: Dict, limit: Optional[int], offset: int, max_results: int = 1000) -> List[Dict]:
+        # Filtered backend query for lessons the local index does not know about yet.
+        # Domain is not stored in vector metadata, so it is matched after the query.
+        backend_filter = {key: value for key, value in filters.items() if key != "domain"}
+        if "url" in backend_filter:
+            # Lessons stored before urls were normalized keep the url as given
+            backend_filter["url"] = {"$in": sorted({filters["url"], normalize_url(filters["url"])})}
+        query_text = " ".join(str(value) for value in filters.values()) or "lesson"
+        top_k = min(max_results, offset + limit) if limit is not None else max_results
+        try:
+            matches = self.backend.query(
+                self.generate_embedding(query_text), top_k=top_k, filter=backend_filter or None
+            )
+        except Exception as e:
+            logger.warning(f"Lesson index missed {backend_filter or filters} and the backend query failed: {str(e)}")
+            return []
+        
+        if filters.get("domain"):
+            domain = filters["domain"].lower()
+            matches = [
+                match for match in matches
+                if extract_domain(normalize_url(match["metadata"].get("url") or "")) == domain
+            ]
+        if matches:
+            self._index_lessons([(match["id"], match["metadata"]) for match in matches])
+            logger.warning(f"Lesson index missed {len(matches)} lessons for {filters}; indexed them from the backend")
         
+        matches.sort(key=lambda match: (match["metadata"].get("timestamp") or "", match["id"]), reverse=True)
+        end = offset + limit if limit is not None else None
         return [
-            {
-                "id": match.id,
-                "score": match.score,
-                "metadata": match.metadata
-            }
-            for match in results.matches
+            {"id": match["id"], "score": None, "metadata": match["metadata"]}
+            for match in matches[offset:end]
         ]
+    
+    def _fetch_lessons(self, lesson_ids: List[str], batch_size: int = 100) -> List[Dict]:
+        metadata = {}
+        for start in range(0, len(lesson_ids), batch_size):
+            metadata.update(self.backend.fetch(lesson_ids[start:start + batch_size]))
+        
+        # Exact metadata matches carry no similarity score
+        return [
+            {"id": lesson_id, "score": None, "metadata": metadata[lesson_id]}
+            for lesson_id in lesson_ids if lesson_id in metadata
+        ]
+    
+    def rebuild_lesson_index(self, batch_size: int = 100) -> int:
+        # Backfill the metadata and lexical indexes from lessons already in the vector backend
+        self.lesson_index.clear()
+        self.lexical_index.clear()
+        indexed = self._index_ids(self.backend.list_ids(), batch_size)
+        self._indexes_synced = True
+        
+        logger.info(f"Rebuilt lesson index with {indexed} lessons")
+        return indexed
+    
+    def ensure_indexes(self, batch_size: int = 100):
+        # Once per process: bring the metadata and lexical indexes in line with the
+        # backend, indexing lessons each one lacks and dropping deleted ones
+        if self._indexes_synced or time.monotonic() < self._index_sync_retry_at:
+            return
+        with self._index_sync_lock:
+            if self._indexes_synced or time.monotonic() < self._index_sync_retry_at:
+                return
+            try:
+                stored = set(self.backend.list_ids())
+                for index in (self.lesson_index, self.lexical_index):
+                    indexed = set(index.ids())
+                    added = self._index_ids(
+                        (lesson_id for lesson_id in stored if lesson_id not in indexed), batch_size, index
+                    )
+                    removed = list(indexed - stored)
+                    index.remove(removed)
+                    if added or removed:
+                        logger.info(
+                            f"Synced {type(index).__name__} with the backend: {added} added, {len(removed)} removed"
+                        )
+                self._indexes_synced = True
+            except Exception as e:
+                self._index_sync_retry_at = time.monotonic() + self.index_sync_backoff
+                logger.warning(
+                    f"Lesson index sync failed, falling back to backend queries on misses "
+                    f"(retrying in {self.index_sync_backoff:.0f}s): {str(e)}"
+                )
+    
+    def _index_ids(self, lesson_ids, batch_size: int, index=None) -> int:
+        indexed = 0
+        batch = []
+        for lesson_id in lesson_ids:
+            batch.append(lesson_id)
+            if len(batch) >= batch_size:
+                indexed += self._index_batch(batch, index)
+                batch = []
+        if batch:
+            indexed += self._index_batch(batch, index)
+        return indexed
+    
+    def _index_batch(self, lesson_ids: List[str], index=None) -> int:
+        # index: one of the two indexes, or both when None
+        fetched = self.backend.fetch(lesson_ids)
+        if index is None:
+            self._index_lessons(list(fetched.items()))
+        else:
+            index.add_many(list(fetched.items()))
+        return len(fetched)
+    
+    def export_snapshot(self, path: str, since: Optional[str] = None) -> Dict:
+        return snapshot.export_snapshot(self, path, since=since)
+    
+    def import_snapshot(self, path: str, verify: bool = True) -> Dict:
+        return snapshot.import_snapshot(self, path, verify=verify)
@@ -0,0 +1,275 @@
+import os
+import json
+import time
+import uuid
+import fcntl
+import atexit
+import tempfile
+import threading
+from typing import Dict, List, Optional
+from loguru import logger
+from utils.helpers import normalize_url
+
+
+class LessonWriteQueue:
+    
+    # Write-behind queue for VectorMemoryStore lessons. Enqueued lessons are spooled
+    # to a local JSONL file (so they survive crashes and outages) and flushed in
+    # batches by a background thread through store_lessons_bulk, with exponential
+    # backoff on failure. Until flushed they are visible through pending_lessons.
+    # Each queue owns its spool file (lesson_spool.<token>.jsonl) and holds a flock
+    # on it while alive; spools whose lock is free belong to dead processes and are
+    # claimed by the next queue to start.
+    
+    def __init__(
+        self,
+        store,
+        spool_path: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_attempts: Optional[int] = None
+    ):
+        self.store = store
+        base_path = spool_path or os.getenv("LESSON_SPOOL_PATH", "cache/lesson_spool.jsonl")
+        self.spool_dir = os.path.dirname(base_path) or "."
+        root, ext = os.path.splitext(os.path.basename(base_path))
+        self._spool_prefix = root + "."
+        self._spool_ext = ext or ".jsonl"
+        self.spool_path = os.path.join(self.spool_dir, f"{root}.{uuid.uuid4().hex[:12]}{self._spool_ext}")
+        self.dead_letter_path = base_path + ".failed"
+        self.batch_size = batch_size or int(os.getenv("LESSON_FLUSH_BATCH_SIZE", "50"))
+        self.flush_interval = flush_interval or float(os.getenv("LESSON_FLUSH_INTERVAL", "2.0"))
+        self.max_attempts = max_attempts or int(os.getenv("LESSON_FLUSH_MAX_ATTEMPTS", "8"))
+        
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._spool_lock = self._try_lock(self.spool_path)
+        
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._pending: Dict[str, Dict] = {}
+        self._attempts = 0
+        self._retry_at = 0.0
+        self.flushed = 0
+        
+        # Lessons spooled by processes that exited before they reached the store
+        self._claim_orphaned_spools()
+        
+        self._thread = threading.Thread(target=self._run, name="lesson-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    @staticmethod
+    def _try_lock(spool_path: str) -> Optional[int]:
+        # Exclusive, non-blocking lock on the spool's .lock file; None if another process holds it
+        fd = os.open(spool_path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return None
+        return fd
+    
+    def _claim_orphaned_spools(self):
+        # Includes lock files left without a spool by a process killed mid-cleanup
+        spools = {
+            name[:-len(".lock")] if name.endswith(".lock") else name
+            for name in os.listdir(self.spool_dir)
+            if name.startswith(self._spool_prefix)
+        }
+        claimed = 0
+        for name in sorted(spools):
+            path = os.path.join(self.spool_dir, name)
+            if path == self.spool_path or not name.endswith(self._spool_ext):
+                continue
+            fd = self._try_lock(path)
+            if fd is None:
+                # Its owner is still running
+                continue
+            try:
+                entries = self._read_spool(path)
+                if entries:
+                    self._pending.update(entries)
+                    self._rewrite_spool()
+                    claimed += len(entries)
+                for leftover in (path, path + ".lock"):
+                    try:
+                        os.unlink(leftover)
+                    except FileNotFoundError:
+                        pass
+            finally:
+                os.close(fd)
+        
+        if claimed:
+            logger.info(f"Recovered {claimed} spooled lessons")
+    
+    @staticmethod
+    def _read_spool(path: str) -> Dict[str, Dict]:
+        if not os.path.exists(path):
+            return {}
+        
+        entries = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                entries[entry["spool_id"]] = entry
+        return entries
+    
+    def _rewrite_spool(self):
+        fd, tmp_path = tempfile.mkstemp(dir=self.spool_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for entry in self._pending.values():
+                f.write(json.dumps(entry, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.spool_path)
+    
+    def enqueue(
+        self,
+        lesson_text: str,
+        url: str,
+        platform: str,
+        friction_type: str,
+        resolution: str,
+        metadata: Optional[Dict] = None
+    ) -> Dict:
+        entry = {
+            "spool_id": uuid.uuid4().hex,
+            "lesson": {
+                "lesson_text": lesson_text,
+                "url": url,
+                "platform": platform,
+                "friction_type": friction_type,
+                "resolution": resolution,
+                "metadata": metadata
+            }
+        }
+        
+        with self._lock:
+            with open(self.spool_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._pending[entry["spool_id"]] = entry
+            full = len(self._pending) >= self.batch_size
+        
+        if full:
+            self._wakeup.set()
+        logger.info(f"Queued lesson for memory: {entry['spool_id']}")
+        return self._as_result(entry)
+    
+    @staticmethod
+    def _as_result(entry: Dict) -> Dict:
+        lesson = entry["lesson"]
+        return {
+            "id": entry["spool_id"],
+            "score": None,
+            "metadata": {
+                "url": lesson["url"],
+                "platform": lesson["platform"],
+                "friction_type": lesson["friction_type"],
+                "resolution": lesson["resolution"],
+                "lesson_text": lesson["lesson_text"][:1000],
+                "pending": True
+            }
+        }
+    
+    def pending_lessons(self, url: Optional[str] = None, platform: Optional[str] = None) -> List[Dict]:
+        # Read-your-writes: lessons not yet flushed, shaped like store query results
+        target = normalize_url(url) if url else None
+        with self._lock:
+            entries = list(self._pending.values())
+        
+        return [
+            self._as_result(entry)
+            for entry in entries
+            if (target is None or normalize_url(entry["lesson"]["url"]) == target)
+            and (platform is None or entry["lesson"]["platform"] == platform)
+        ]
+    
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if time.monotonic() >= self._retry_at:
+                self.flush()
+    
+    def flush(self) -> int:
+        with self._flush_lock:
+            return self._flush_batch()
+    
+    def _flush_batch(self) -> int:
+        with self._lock:
+            batch = list(self._pending.values())[:self.batch_size]
+        if not batch:
+            return 0
+        
+        try:
+            result = self.store.store_lessons_bulk([entry["lesson"] for entry in batch])
+            failed_positions = {failure["index"] for failure in result["failed"]}
+        except Exception as e:
+            logger.error(f"Lesson flush failed: {str(e)}")
+            failed_positions = set(range(len(batch)))
+        
+        done = [entry["spool_id"] for position, entry in enumerate(batch) if position not in failed_positions]
+        
+        with self._lock:
+            for spool_id in done:
+                self._pending.pop(spool_id, None)
+            
+            if failed_positions:
+                self._attempts += 1
+                if self._attempts >= self.max_attempts:
+                    self._dead_letter([batch[position] for position in failed_positions])
+                    self._attempts = 0
+                    self._retry_at = 0.0
+                else:
+                    # Exponential backoff, capped at five minutes
+                    self._retry_at = time.monotonic() + min(300.0, self.flush_interval * 2 ** self._attempts)
+            else:
+                self._attempts = 0
+                self._retry_at = 0.0
+            
+            self._rewrite_spool()
+            more = len(self._pending) >= self.batch_size
+        
+        self.flushed += len(done)
+        if more and not failed_positions:
+            self._wakeup.set()
+        return len(done)
+    
+    def _dead_letter(self, entries: List[Dict]):
+        with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, default=str) + "\n")
+                self._pending.pop(entry["spool_id"], None)
+        logger.error(f"Moved {len(entries)} lessons to {self.dead_letter_path} after {self.max_attempts} attempts")
+    
+    def __len__(self) -> int:
+        return len(self._pending)
+    
+    def close(self, timeout: float = 10.0):
+        # Best-effort drain on shutdown; anything left stays spooled for the next process
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+        
+        deadline = time.monotonic() + timeout
+        while self._pending and time.monotonic() < deadline:
+            if not self.flush() and self._attempts:
+                break
+        
+        # A drained spool is removed; otherwise the lock is released at exit and
+        # the next queue to start claims it
+        if not self._pending:
+            for path in (self.spool_path, self.spool_path + ".lock"):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
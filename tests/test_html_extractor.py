@@ -0,0 +1,36 @@
+from integrations.html_extractor import extract_page_structure
+
+
+def _selectors(html):
+    return [element["selector"] for element in extract_page_structure(html)["interactive_elements"]]
+
+
+def test_rows_directly_in_table_get_the_implicit_tbody():
+    html = "<html><body><table><tr><td><button>Buy</button></td></tr></table></body></html>"
+    assert _selectors(html) == [
+        "html:nth-of-type(1) > body:nth-of-type(1) > table:nth-of-type(1) > tbody:nth-of-type(1) > "
+        "tr:nth-of-type(1) > td:nth-of-type(1) > button:nth-of-type(1)"
+    ]
+
+
+def test_each_run_of_bare_rows_gets_its_own_tbody():
+    html = (
+        '<table id="cart"><caption>Cart</caption>'
+        "<tr><td><button>a</button></td></tr><tr><td><button>b</button></td></tr>"
+        "<tbody><tr><td><button>c</button></td></tr></tbody>"
+        "<tr><td><button>d</button></td></tr></table>"
+    )
+    row = " > td:nth-of-type(1) > button:nth-of-type(1)"
+    assert _selectors(html) == [
+        "#cart > tbody:nth-of-type(1) > tr:nth-of-type(1)" + row,
+        "#cart > tbody:nth-of-type(1) > tr:nth-of-type(2)" + row,
+        "#cart > tbody:nth-of-type(2) > tr:nth-of-type(1)" + row,
+        "#cart > tbody:nth-of-type(3) > tr:nth-of-type(1)" + row,
+    ]
+
+
+def test_explicit_tbody_is_not_doubled():
+    html = "<table id=\"t\"><thead><tr><th><a href=\"#\">Sort</a></th></tr></thead></table>"
+    assert _selectors(html) == [
+        "#t > thead:nth-of-type(1) > tr:nth-of-type(1) > th:nth-of-type(1) > a:nth-of-type(1)"
+    ]
@@ -0,0 +1,152 @@
+"""
+Context Packer - Builds token-budgeted, relevance-ranked prompt context
+"""
+
+import json
+import re
+from typing import Any, List, Optional
+from loguru import logger
+from utils.embedding_service import get_embedding_service
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (~4 characters per token for English/markup)"""
+    return max(1, len(text) // 4)
+
+
+class ContextPacker:
+    """
+    Splits page markdown and semantic schemas into sections, ranks them against
+    the current mission step using local embeddings, and packs the most relevant
+    sections into a token budget (instead of blind character slicing).
+    """
+    
+    def __init__(self, max_section_tokens: int = 300):
+        """
+        Args:
+            max_section_tokens: Sections longer than this are split by paragraph
+        """
+        self.max_section_tokens = max_section_tokens
+    
+    def split_markdown(self, markdown: Optional[str]) -> List[str]:
+        """Split markdown at headings, then split oversized sections by paragraph"""
+        if not markdown:
+            return []
+        
+        sections = [
+            section.strip()
+            for section in re.split(r'(?m)^(?=#{1,6}\s)', markdown)
+            if section.strip()
+        ]
+        
+        result = []
+        for section in sections:
+            if estimate_tokens(section) <= self.max_section_tokens:
+                result.append(section)
+                continue
+            
+            chunk = ""
+            for paragraph in re.split(r'\n\s*\n', section):
+                if chunk and estimate_tokens(chunk + paragraph) > self.max_section_tokens:
+                    result.append(chunk.strip())
+                    chunk = ""
+                chunk += paragraph + "\n\n"
+            if chunk.strip():
+                result.append(chunk.strip())
+        
+        return result
+    
+    def split_schema(self, schema: Any) -> List[str]:
+        """Split a semantic schema into one section per element / top-level entry"""
+        if not schema:
+            return []
+        
+        if isinstance(schema, list):
+            return [json.dumps(item, default=str, ensure_ascii=False) for item in schema]
+        
+        if not isinstance(schema, dict):
+            return [str(schema)]
+        
+        sections = []
+        for key, value in schema.items():
+            if isinstance(value, list) and value:
+                sections.extend(
+                    f"{key}: {json.dumps(item, default=str, ensure_ascii=False)}"
+                    for item in value
+                )
+            elif value not in (None, "", {}, []) and not isinstance(value, bool):
+                sections.append(f"{key}: {json.dumps(value, default=str, ensure_ascii=False)}")
+        return sections
+    
+    def rank(self, sections: List[str], query: str) -> List[float]:
+        """
+        Score each section's relevance to the query.
+        
+        Uses the local MiniLM embedding model; falls back to term overlap when
+        the model cannot be loaded or the embedding service fails, so prompt
+        construction never depends on embeddings being available.
+        """
+        try:
+            embeddings = get_embedding_service().embed([query] + sections, normalize=True)
+            return (embeddings[1:] @ embeddings[0]).tolist()
+        except Exception as e:
+            logger.warning(f"Local embeddings unavailable ({str(e)}), ranking context by term overlap")
+            query_terms = set(re.findall(r'\w+', query.lower()))
+            return [
+                len(query_terms & set(re.findall(r'\w+', section.lower()))) / (len(query_terms) or 1)
+                for section in sections
+            ]
+    
+    def pack(
+        self,
+        sections: List[str],
+        query: str,
+        token_budget: int,
+        separator: str = "\n\n"
+    ) -> str:
+        """
+        Pack the most relevant sections into the token budget.
+        
+        Args:
+            sections: Candidate context sections
+            query: Mission step / objective to rank sections against
+            token_budget: Maximum tokens of context to emit
+            separator: String placed between packed sections
+        
+        Returns:
+            Selected sections joined in their original document order
+        """
+        if not sections:
+            return ""
+        
+        sizes = [estimate_tokens(section) for section in sections]
+        if sum(sizes) <= token_budget:
+            return separator.join(sections)
+        
+        if query:
+            scores = self.rank(sections, query)
+            order = sorted(range(len(sections)), key=lambda i: scores[i], reverse=True)
+        else:
+            order = list(range(len(sections)))
+        
+        selected = []
+        remaining = token_budget
+        for i in order:
+            if sizes[i] <= remaining:
+                selected.append(i)
+                remaining -= sizes[i]
+        
+        # Nothing fits whole (e.g. a single unstructured blob): trim the best match
+        if not selected:
+            return sections[order[0]][:token_budget * 4]
+        
+        logger.debug(f"Packed {len(selected)}/{len(sections)} context sections into {token_budget - remaining} tokens")
+        return separator.join(sections[i] for i in sorted(selected))
+    
+    def pack_markdown(self, markdown: Optional[str], query: str, token_budget: int) -> str:
+        """Split and pack page markdown"""
+        return self.pack(self.split_markdown(markdown), query, token_budget)
+    
+    def pack_schema(self, schema: Any, query: str, token_budget: int) -> str:
+        """Split and pack a semantic schema (or a list of schema elements)"""
+        return self.pack(self.split_schema(schema), query, token_budget, separator="\n")
@@ -0,0 +1,291 @@
+"""
+EmbeddingService - Shared local sentence embeddings with request micro-batching
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+from loguru import logger
+
+
+DEFAULT_MODEL = 'all-MiniLM-L6-v2'
+DEFAULT_ADDRESS = '127.0.0.1:7601'
+
+_services: Dict[str, "LocalEmbeddingService"] = {}
+_shared: Dict[str, object] = {}
+_services_lock = threading.Lock()
+
+
+def _normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.where(norms == 0, 1.0, norms)
+
+
+class LocalEmbeddingService:
+    """
+    Owns one SentenceTransformer per process. Concurrent `embed` calls are queued
+    and encoded together by a single worker thread, so many small requests become
+    one model forward pass.
+    """
+    
+    def __init__(self, model_name: str = DEFAULT_MODEL, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        """
+        Args:
+            model_name: sentence-transformers model to load (on first use)
+            max_batch_size: Maximum number of requests merged into one encode call
+            max_wait_ms: How long the worker waits for more requests to join a batch
+        """
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._requests: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+    
+    @property
+    def model(self):
+        """The underlying SentenceTransformer, loaded once"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    logger.info(f"Loading embedding model: {self.model_name}")
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+    
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+    
+    def embed(self, texts: List[str], normalize: bool = False) -> np.ndarray:
+        """Embed texts (blocking); requests from concurrent callers are batched together"""
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        
+        self._ensure_worker()
+        future: Future = Future()
+        self._requests.put((list(texts), future))
+        embeddings = future.result()
+        return _normalize_rows(embeddings) if normalize else embeddings
+    
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            with self._worker_lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(
+                        target=self._run, name=f"embedding-{self.model_name}", daemon=True
+                    )
+                    self._worker.start()
+    
+    def _run(self):
+        while True:
+            batch = [self._requests.get()]
+            
+            # Give concurrent callers a brief window to join this batch
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._requests.get(timeout=self.max_wait))
+                except queue.Empty:
+                    break
+            
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            try:
+                embeddings = np.asarray(self.model.encode(texts, convert_to_numpy=True), dtype=np.float32)
+            except BaseException as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            
+            self.batches += 1
+            self.requests += len(batch)
+            offset = 0
+            for request_texts, future in batch:
+                future.set_result(embeddings[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+    
+    def get_stats(self) -> Dict:
+        """Requests served and encode batches run"""
+        return {
+            'model': self.model_name,
+            'requests': self.requests,
+            'batches': self.batches,
+            'requests_per_batch': self.requests / self.batches if self.batches else 0.0
+        }
+
+
+class RemoteEmbeddingService:
+    """
+    Client for an embedding server started with `serve()`, so every worker
+    process on a host shares one model copy. Same interface as LocalEmbeddingService.
+    If the server goes away, each call reconnects once and otherwise falls back
+    to the in-process model.
+    """
+    
+    def __init__(self, address: Union[str, Tuple[str, int]], authkey: bytes, model_name: str = DEFAULT_MODEL):
+        self.address = address
+        self.authkey = authkey
+        self.model_name = model_name
+        self._local = threading.local()
+        self._dimension: Optional[int] = None
+        self._using_fallback = False
+        
+        # Fail fast if the server is unreachable
+        self._call("ping")
+    
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = Client(self.address, authkey=self.authkey)
+            self._local.connection = connection
+        return connection
+    
+    def _call(self, *request):
+        # A dropped connection (server restart, idle timeout) gets one fresh retry
+        for attempt in range(2):
+            try:
+                connection = self._connection()
+                connection.send(request)
+                status, payload = connection.recv()
+                break
+            except (EOFError, OSError):
+                self._local.connection = None
+                if attempt:
+                    raise
+        if status == "error":
+            raise RuntimeError(f"Embedding server error: {payload}")
+        return payload
+    
+    def _fallback(self, error: Exception) -> LocalEmbeddingService:
+        if not self._using_fallback:
+            logger.warning(f"Embedding server at {self.address} unavailable ({str(error)}), using the in-process model")
+            self._using_fallback = True
+        return get_local_embedding_service(self.model_name)
+    
+    @property
+    def dimension(self) -> int:
+        if self._dimension is None:
+            try:
+                self._dimension = self._call("dimension", self.model_name)
+            except (EOFError, OSError) as e:
+                self._dimension = self._fallback(e).dimension
+        return self._dimension
+    
+    def embed(self, texts: List[str], normalize: bool = False) -> np.ndarray:
+        try:
+            embeddings = self._call("embed", self.model_name, list(texts), normalize)
+        except (EOFError, OSError) as e:
+            return self._fallback(e).embed(texts, normalize=normalize)
+        if self._using_fallback:
+            logger.info(f"Embedding server at {self.address} is back")
+            self._using_fallback = False
+        return embeddings
+
+
+def _parse_address(address: str) -> Union[str, Tuple[str, int]]:
+    """'host:port' -> TCP address; anything else is a Unix socket path"""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return (host or "127.0.0.1", int(port))
+    return address
+
+
+def _authkey() -> bytes:
+    """EMBEDDING_SERVICE_AUTHKEY as bytes (raises ValueError when unset)"""
+    authkey = os.getenv("EMBEDDING_SERVICE_AUTHKEY", "")
+    if not authkey:
+        raise ValueError("EMBEDDING_SERVICE_AUTHKEY must be set to share the embedding server")
+    return authkey.encode()
+
+
+def get_local_embedding_service(model_name: str = DEFAULT_MODEL) -> LocalEmbeddingService:
+    """The process-wide LocalEmbeddingService for a model"""
+    with _services_lock:
+        if model_name not in _services:
+            _services[model_name] = LocalEmbeddingService(model_name)
+        return _services[model_name]
+
+
+def get_embedding_service(model_name: str = DEFAULT_MODEL):
+    """
+    Embedding service for this process. Uses the host-wide server when
+    EMBEDDING_SERVICE_ADDRESS is set and reachable, otherwise the in-process model.
+    """
+    service = _shared.get(model_name)
+    if service is not None:
+        return service
+    
+    address = os.getenv("EMBEDDING_SERVICE_ADDRESS")
+    if address:
+        try:
+            service = RemoteEmbeddingService(_parse_address(address), _authkey(), model_name)
+        except (OSError, EOFError, AuthenticationError, ValueError) as e:
+            logger.warning(f"Embedding server at {address} unavailable ({str(e)}), loading model in-process")
+    
+    service = service or get_local_embedding_service(model_name)
+    with _services_lock:
+        return _shared.setdefault(model_name, service)
+
+
+def serve(address: str = DEFAULT_ADDRESS, authkey: Optional[bytes] = None):
+    """
+    Run a host-wide embedding server; requests from all clients share one micro-batcher per model.
+    
+    Connections exchange pickles, so the server refuses to start without an authkey
+    and should stay on a loopback address or a Unix socket.
+    
+    Args:
+        address: 'host:port' or a Unix socket path (default: 127.0.0.1:7601)
+        authkey: Shared secret clients must present
+    """
+    if not authkey:
+        raise ValueError("The embedding server needs an authkey (set EMBEDDING_SERVICE_AUTHKEY)")
+    
+    parsed = _parse_address(address)
+    if isinstance(parsed, tuple) and parsed[0] not in ("127.0.0.1", "localhost", "::1"):
+        logger.warning(f"Embedding server is listening on non-loopback address {address}")
+    
+    listener = Listener(parsed, authkey=authkey)
+    logger.info(f"Embedding server listening on {address}")
+    
+    def handle(connection):
+        with connection:
+            while True:
+                try:
+                    request = connection.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    if request[0] == "ping":
+                        response = ("ok", None)
+                    elif request[0] == "dimension":
+                        response = ("ok", get_local_embedding_service(request[1]).dimension)
+                    elif request[0] == "embed":
+                        _, model_name, texts, normalize = request
+                        response = ("ok", get_local_embedding_service(model_name).embed(texts, normalize=normalize))
+                    else:
+                        response = ("error", f"unknown request {request[0]!r}")
+                except Exception as e:
+                    response = ("error", str(e))
+                connection.send(response)
+    
+    while True:
+        try:
+            connection = listener.accept()
+        except (AuthenticationError, EOFError, OSError) as e:
+            # A client with the wrong authkey must not take the server down
+            logger.warning(f"Rejected embedding server connection: {str(e)}")
+            continue
+        threading.Thread(target=handle, args=(connection,), daemon=True).start()
+
+
+if __name__ == "__main__":
+    serve(os.getenv("EMBEDDING_SERVICE_ADDRESS") or DEFAULT_ADDRESS, _authkey())
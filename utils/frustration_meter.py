@@ -2,12 +2,67 @@
 Frustration Meter - Tracks user frustration and triggers HITL interrupts
 """
 
+import math
+import time
+from array import array
+from collections import deque
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from loguru import logger
 
 
+EVENT_TYPES = ('friction', 'retry', 'timeout', 'error')
+DECAY = 0.8
+
+# _DECAY_TOTALS[n] is the sum 0.8**0 + ... + 0.8**(n-1), accumulated in that order.
+# The sum stops changing after ~170 terms, so the list stays short.
+_DECAY_TOTALS = [0.0]
+_decay_saturated = False
+
+
+def _decay_total(n: int) -> float:
+    """Total decay weight of n events, identical to summing the weights one by one"""
+    global _decay_saturated
+    while n >= len(_DECAY_TOTALS) and not _decay_saturated:
+        i = len(_DECAY_TOTALS) - 1
+        total = _DECAY_TOTALS[-1] + DECAY ** i
+        if total == _DECAY_TOTALS[-1]:
+            _decay_saturated = True
+            break
+        _DECAY_TOTALS.append(total)
+    return _DECAY_TOTALS[min(n, len(_DECAY_TOTALS) - 1)]
+
+
+class _RingBuffer:
+    """Fixed-capacity typed array; indexes run oldest (0) to newest (len - 1)"""
+    
+    def __init__(self, typecode: str, capacity: int):
+        self._data = array(typecode, bytes(array(typecode).itemsize * capacity))
+        self.capacity = capacity
+        self._start = 0
+        self._length = 0
+    
+    def append(self, value):
+        if self._length < self.capacity:
+            self._data[(self._start + self._length) % self.capacity] = value
+            self._length += 1
+        else:
+            # Full: overwrite the oldest entry
+            self._data[self._start] = value
+            self._start = (self._start + 1) % self.capacity
+    
+    def __getitem__(self, index: int):
+        return self._data[(self._start + index) % self.capacity]
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def clear(self):
+        self._start = 0
+        self._length = 0
+
+
 @dataclass
 class FrustrationEvent:
     """Single event contributing to frustration score"""
@@ -30,7 +85,10 @@ class FrustrationMeter:
         max_retries: int = 3,
         timeout_weight: float = 0.3,
         friction_weight: float = 0.4,
-        error_weight: float = 0.3
+        error_weight: float = 0.3,
+        max_events: int = 1000,
+        max_event_details: int = 100,
+        score_window: int = 4096
     ):
         """
         Initialize the frustration meter.
@@ -41,6 +99,10 @@ class FrustrationMeter:
             timeout_weight: Weight for timeout events
             friction_weight: Weight for friction point events
             error_weight: Weight for error events
+            max_events: Most recent events kept (type, severity, time)
+            max_event_details: Most recent events whose description and context are kept
+            score_window: Severities kept per event type for scoring; older events
+                          are already too decayed to change the score
         """
         self.hitl_threshold = hitl_threshold
         self.max_retries = max_retries
@@ -48,7 +110,23 @@ class FrustrationMeter:
         self.friction_weight = friction_weight
         self.error_weight = error_weight
         
-        self.events: List[FrustrationEvent] = []
+        # Recent events as parallel typed arrays, with descriptions and contexts in
+        # a shorter ring; memory stays constant however long the session runs
+        self._event_types = _RingBuffer('B', max_events)
+        self._event_severities = _RingBuffer('d', max_events)
+        self._event_times = _RingBuffer('d', max_events)
+        self._event_details: deque = deque(maxlen=max_event_details)
+        self._clock_origin = (datetime.now(), time.monotonic())
+        
+        # Per-type severities (oldest first), counts and component scores, so an
+        # event only rescores its own type. Counts include evicted events.
+        self._severities: Dict[str, _RingBuffer] = {t: _RingBuffer('d', score_window) for t in EVENT_TYPES}
+        self._max_severity: Dict[str, float] = {t: 0.0 for t in EVENT_TYPES}
+        self._nonnegative: Dict[str, bool] = {t: True for t in EVENT_TYPES}
+        self._component_scores: Dict[str, float] = {t: 0.0 for t in EVENT_TYPES}
+        self.event_counts: Dict[str, int] = {t: 0 for t in EVENT_TYPES}
+        self.total_events = 0
+        
         self.retry_count = 0
         self.current_score = 0.0
         self.hitl_triggered = False
@@ -70,7 +148,7 @@ class FrustrationMeter:
             issue_type: Type of issue (visibility, cognitive_load, etc.)
             severity: low/medium/high/critical
             persona_impact: Why this matters for the persona
-            
+        
         Returns:
             Updated frustration score
         """
@@ -83,8 +161,7 @@ class FrustrationMeter:
         
         severity_score = severity_map.get(severity.lower(), 0.5)
         
-        event = FrustrationEvent(
-            timestamp=datetime.now().isoformat(),
+        self._add_event(
             event_type='friction',
             severity=severity_score,
             description=f"{issue_type} on {element}",
@@ -96,9 +173,6 @@ class FrustrationMeter:
             }
         )
         
-        self.events.append(event)
-        self._recalculate_score()
-        
         logger.debug(f"Friction recorded: {element} ({severity}) - Score: {self.current_score:.2f}")
         return self.current_score
     
@@ -115,7 +189,7 @@ class FrustrationMeter:
             action: Action that was retried
             reason: Why retry was needed
             attempt_number: Which attempt this is
-            
+        
         Returns:
             Updated frustration score
         """
@@ -124,8 +198,7 @@ class FrustrationMeter:
         # Retries get progressively more severe
         severity = min(0.3 + (attempt_number * 0.2), 1.0)
         
-        event = FrustrationEvent(
-            timestamp=datetime.now().isoformat(),
+        self._add_event(
             event_type='retry',
             severity=severity,
             description=f"Retry #{attempt_number}: {action}",
@@ -136,9 +209,6 @@ class FrustrationMeter:
             }
         )
         
-        self.events.append(event)
-        self._recalculate_score()
-        
         # Check if max retries exceeded
         if self.retry_count >= self.max_retries:
             self.hitl_triggered = True
@@ -160,7 +230,7 @@ class FrustrationMeter:
             action: Action that timed out
             timeout_duration: How long it took
             expected_duration: How long it should have taken
-            
+        
         Returns:
             Updated frustration score
         """
@@ -168,8 +238,7 @@ class FrustrationMeter:
         ratio = timeout_duration / expected_duration if expected_duration > 0 else 2.0
         severity = min(0.5 + (ratio - 1.0) * 0.3, 1.0)
         
-        event = FrustrationEvent(
-            timestamp=datetime.now().isoformat(),
+        self._add_event(
             event_type='timeout',
             severity=severity,
             description=f"Timeout on {action}",
@@ -181,9 +250,6 @@ class FrustrationMeter:
             }
         )
         
-        self.events.append(event)
-        self._recalculate_score()
-        
         logger.debug(f"Timeout recorded: {action} ({timeout_duration:.1f}s) - Score: {self.current_score:.2f}")
         return self.current_score
     
@@ -202,14 +268,13 @@ class FrustrationMeter:
             error_type: Type of error
             error_message: Error details
             is_recoverable: Whether error can be recovered from
-            
+        
         Returns:
             Updated frustration score
         """
         severity = 0.6 if is_recoverable else 1.0
         
-        event = FrustrationEvent(
-            timestamp=datetime.now().isoformat(),
+        self._add_event(
             event_type='error',
             severity=severity,
             description=f"Error on {action}: {error_type}",
@@ -221,38 +286,72 @@ class FrustrationMeter:
             }
         )
         
-        self.events.append(event)
-        self._recalculate_score()
-        
         logger.debug(f"Error recorded: {action} ({error_type}) - Score: {self.current_score:.2f}")
         return self.current_score
     
-    def _recalculate_score(self):
+    def _add_event(self, event_type: str, severity: float, description: str, context: Dict[str, Any]):
+        """Store an event and update the score for its type"""
+        self._event_types.append(EVENT_TYPES.index(event_type))
+        self._event_severities.append(severity)
+        self._event_times.append(time.monotonic())
+        self._event_details.append((description, context))
+        self.total_events += 1
+        
+        self._severities[event_type].append(severity)
+        self._max_severity[event_type] = max(self._max_severity[event_type], abs(severity))
+        if severity < 0:
+            self._nonnegative[event_type] = False
+        self.event_counts[event_type] += 1
+        
+        self._recalculate_score(event_type)
+    
+    @property
+    def events(self) -> List[FrustrationEvent]:
+        """
+        Retained events, oldest first. Events older than the details ring
+        come back with an empty description and context.
+        """
+        return self._rebuild_events(0)
+    
+    def _rebuild_events(self, start: int) -> List[FrustrationEvent]:
+        """FrustrationEvents for retained positions start..newest"""
+        count = len(self._event_types)
+        details = list(self._event_details)
+        first_detailed = count - len(details)
+        origin_wall, origin_monotonic = self._clock_origin
+        
+        events = []
+        for index in range(max(start, 0), count):
+            description, context = details[index - first_detailed] if index >= first_detailed else ('', {})
+            events.append(FrustrationEvent(
+                timestamp=(origin_wall + timedelta(seconds=self._event_times[index] - origin_monotonic)).isoformat(),
+                event_type=EVENT_TYPES[self._event_types[index]],
+                severity=self._event_severities[index],
+                description=description,
+                context=context
+            ))
+        return events
+    
+    def _recalculate_score(self, event_type: Optional[str] = None):
         """
-        Recalculate frustration score based on all events.
+        Recalculate frustration score from the per-type component scores.
         Uses weighted average with time decay (recent events matter more).
+        
+        Args:
+            event_type: Only this component changed (default: recompute all)
         """
-        if not self.events:
+        if not self.total_events:
             self.current_score = 0.0
             return
         
-        # Separate events by type
-        friction_events = [e for e in self.events if e.event_type == 'friction']
-        retry_events = [e for e in self.events if e.event_type == 'retry']
-        timeout_events = [e for e in self.events if e.event_type == 'timeout']
-        error_events = [e for e in self.events if e.event_type == 'error']
-        
-        # Calculate component scores
-        friction_score = self._calculate_component_score(friction_events)
-        retry_score = self._calculate_component_score(retry_events)
-        timeout_score = self._calculate_component_score(timeout_events)
-        error_score = self._calculate_component_score(error_events)
+        for changed in ([event_type] if event_type else EVENT_TYPES):
+            self._component_scores[changed] = self._calculate_component_score(changed)
         
         # Weighted combination
         self.current_score = (
-            friction_score * self.friction_weight +
-            (retry_score + timeout_score) * self.timeout_weight +
-            error_score * self.error_weight
+            self._component_scores['friction'] * self.friction_weight +
+            (self._component_scores['retry'] + self._component_scores['timeout']) * self.timeout_weight +
+            self._component_scores['error'] * self.error_weight
         )
         
         # Check if threshold exceeded
@@ -260,21 +359,35 @@ class FrustrationMeter:
             self.hitl_triggered = True
             logger.warning(f"Frustration threshold ({self.hitl_threshold}) exceeded - HITL triggered")
     
-    def _calculate_component_score(self, events: List[FrustrationEvent]) -> float:
-        """Calculate score for a specific event type with time decay"""
-        if not events:
+    def _calculate_component_score(self, event_type: str) -> float:
+        """
+        Calculate score for a specific event type with time decay.
+        
+        Walks newest-first like a full recomputation, but stops once the remaining
+        (ever smaller) terms are below half an ulp of the partial sum: adding them
+        can no longer change the float result, so the score stays bit-identical
+        while the walk is bounded by ~170 events instead of the session length.
+        The per-type window only holds score_window severities; that is enough for
+        the walk to stop first unless a type's recent severities are all zero.
+        """
+        severities = self._severities[event_type]
+        if not severities:
             return 0.0
         
         # Recent events have more weight (exponential decay)
-        total_weight = 0.0
+        n = len(severities)
+        max_severity = self._max_severity[event_type]
+        can_stop = self._nonnegative[event_type]
         weighted_sum = 0.0
         
-        for i, event in enumerate(reversed(events)):
+        for i in range(n):
             # More recent = higher weight (decay factor 0.8)
-            weight = 0.8 ** i
-            weighted_sum += event.severity * weight
-            total_weight += weight
+            weight = DECAY ** i
+            if can_stop and weight * max_severity < math.ulp(weighted_sum) / 2:
+                break
+            weighted_sum += severities[n - 1 - i] * weight
         
+        total_weight = _decay_total(self.event_counts[event_type])
         return weighted_sum / total_weight if total_weight > 0 else 0.0
     
     def should_trigger_hitl(self) -> bool:
@@ -288,13 +401,13 @@ class FrustrationMeter:
         Returns:
             Dictionary with frustration details for human review
         """
-        recent_events = self.events[-5:] if len(self.events) > 5 else self.events
+        recent_events = self._rebuild_events(len(self._event_types) - 5)
         
         return {
             'frustration_score': self.current_score,
             'threshold': self.hitl_threshold,
             'retry_count': self.retry_count,
-            'total_events': len(self.events),
+            'total_events': self.total_events,
             'recent_events': [
                 {
                     'type': e.event_type,
@@ -305,10 +418,10 @@ class FrustrationMeter:
                 for e in recent_events
             ],
             'event_breakdown': {
-                'friction': len([e for e in self.events if e.event_type == 'friction']),
-                'retries': len([e for e in self.events if e.event_type == 'retry']),
-                'timeouts': len([e for e in self.events if e.event_type == 'timeout']),
-                'errors': len([e for e in self.events if e.event_type == 'error'])
+                'friction': self.event_counts['friction'],
+                'retries': self.event_counts['retry'],
+                'timeouts': self.event_counts['timeout'],
+                'errors': self.event_counts['error']
             },
             'recommendation': self._get_recommendation()
         }
@@ -328,7 +441,17 @@ class FrustrationMeter:
     
     def reset(self):
         """Reset the frustration meter for a new test"""
-        self.events.clear()
+        self._event_types.clear()
+        self._event_severities.clear()
+        self._event_times.clear()
+        self._event_details.clear()
+        self.total_events = 0
+        for event_type in EVENT_TYPES:
+            self._severities[event_type].clear()
+            self._max_severity[event_type] = 0.0
+            self._nonnegative[event_type] = True
+            self._component_scores[event_type] = 0.0
+            self.event_counts[event_type] = 0
         self.retry_count = 0
         self.current_score = 0.0
         self.hitl_triggered = False
@@ -339,14 +462,9 @@ class FrustrationMeter:
         return {
             'current_score': self.current_score,
             'hitl_triggered': self.hitl_triggered,
-            'total_events': len(self.events),
+            'total_events': self.total_events,
             'retry_count': self.retry_count,
-            'event_types': {
-                'friction': len([e for e in self.events if e.event_type == 'friction']),
-                'retry': len([e for e in self.events if e.event_type == 'retry']),
-                'timeout': len([e for e in self.events if e.event_type == 'timeout']),
-                'error': len([e for e in self.events if e.event_type == 'error'])
-            }
+            'event_types': dict(self.event_counts)
         }
 
 
@@ -72,6 +72,29 @@ def extract_domain(url: str) -> str:
     return parsed.netloc or parsed.path
 
 
+TRACKING_PARAM_PREFIXES = ("utm_",)
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "_ga", "igshid"}
+
+
+def normalize_url(url: str) -> str:
+    from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+    parts = urlsplit(url.strip())
+    
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    )
+    
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
 def calculate_sentiment_score(friction_points: list) -> float:
     if not friction_points:
         return 1.0
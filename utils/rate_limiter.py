@@ -0,0 +1,69 @@
+"""
+TokenBucket - Rate limiter shared by sync and async callers
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens are added per second up to `capacity`.
+    Each request consumes one token, so bursts up to `capacity` are allowed while
+    the sustained rate never exceeds `rate`.
+    
+    State is guarded by a thread lock (not an asyncio lock), so one bucket can be
+    shared across threads and event loops to enforce a single API quota.
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens added per second (sustained requests per second)
+            capacity: Maximum burst size (defaults to max(1, rate))
+        """
+        if rate <= 0:
+            raise ValueError(f"TokenBucket rate must be positive, got {rate}")
+        capacity = capacity if capacity is not None else max(1.0, rate)
+        if capacity < 1:
+            raise ValueError(f"TokenBucket capacity must be at least 1, got {capacity}")
+        
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self, tokens: float) -> float:
+        """Take tokens if available; otherwise return seconds to wait before retrying"""
+        if tokens > self.capacity:
+            # Would never become available and wait forever
+            raise ValueError(f"Requested {tokens} tokens exceeds bucket capacity {self.capacity}")
+        
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+    
+    async def acquire(self, tokens: float = 1.0):
+        """Wait (asynchronously) until `tokens` are available and consume them"""
+        while True:
+            wait = self._reserve(tokens)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+    
+    def acquire_sync(self, tokens: float = 1.0):
+        """Blocking variant of `acquire` for synchronous callers"""
+        while True:
+            wait = self._reserve(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
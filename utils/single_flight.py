@@ -0,0 +1,83 @@
+"""
+SingleFlight - Coalesces identical concurrent async calls into a single execution
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict
+from loguru import logger
+
+
+class SingleFlight:
+    """
+    Ensures only one call per key is in flight at a time. Callers that arrive
+    while a call for the same key is running wait for it and share its result.
+    
+    In-flight calls are tracked with thread-safe futures, so callers running in
+    separate event loops (e.g. several `asyncio.run` invocations on worker
+    threads) are coalesced as well.
+    """
+    
+    def __init__(self, name: str = "single_flight"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._executions = 0
+        self._coalesced = 0
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `fn` for `key`, or wait for the call already in flight for `key`.
+        
+        Args:
+            key: Identity of the call (callers with equal keys share results)
+            fn: Zero-argument coroutine factory performing the actual work
+        
+        Returns:
+            Result of the (possibly shared) call
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._calls[key] = future
+                self._executions += 1
+            else:
+                self._coalesced += 1
+        
+        if is_leader:
+            # The shared work runs in its own task, so it outlives any one caller
+            task = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._settle(key, future, done))
+        else:
+            logger.debug(f"[{self.name}] Coalesced request for: {key}")
+        
+        # Shielded: a caller's own cancellation (e.g. a wait_for timeout) must not
+        # cancel the shared call for everyone else waiting on it
+        return await asyncio.shield(asyncio.wrap_future(future))
+    
+    def _settle(self, key: str, future: Future, task: asyncio.Future):
+        """Publish the finished task's outcome to every waiter"""
+        with self._lock:
+            self._calls.pop(key, None)
+        
+        if task.cancelled():
+            # Only happens when the leader's event loop shuts down mid-call
+            future.set_exception(RuntimeError(f"[{self.name}] Shared call for {key} was cancelled"))
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get coalescing statistics"""
+        with self._lock:
+            total = self._executions + self._coalesced
+            return {
+                'executions': self._executions,
+                'coalesced_hits': self._coalesced,
+                'in_flight': len(self._calls),
+                'hit_rate': self._coalesced / total if total else 0.0
+            }